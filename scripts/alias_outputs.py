@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+WEBPAGE_DIR = SCRIPT_DIR.parent / "webpage"
+if str(WEBPAGE_DIR) not in sys.path:
+    sys.path.insert(0, str(WEBPAGE_DIR))
+
+from coverage import profile_sort_key
+from discovery import OUTPUT_ALIAS_FILE, discover_examples, find_generate_files
+from models import ExampleOutput, ExampleSystem
+from mrdi_canonical import encode_canonical
+from settings import ROOT
+
+
+def same_generate_files(output: ExampleOutput, target: ExampleOutput) -> bool:
+    if [path.name for path in output.generate_files] != [path.name for path in target.generate_files]:
+        return False
+    return all(left.read_bytes() == right.read_bytes() for left, right in zip(output.generate_files, target.generate_files))
+
+
+def without_namespaces(payload: dict) -> dict:
+    return {key: value for key, value in payload.items() if key != "_ns"}
+
+
+def same_json(left: object, right: object) -> bool:
+    # Python == treats true, 1 and 1.0 as equal; their JSON encodings differ.
+    return encode_canonical(left) == encode_canonical(right)
+
+
+def encode_alias(alias: dict) -> bytes:
+    return json.dumps(alias, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def alias_for(output: ExampleOutput, target: ExampleOutput, original_size: int) -> dict | None:
+    # The payloads must be equal apart from the top-level `_ns`, which the
+    # alias records. Key order and formatting of the file do not matter.
+    if output.data_file is None or target.data_file is None or output.data_file.name != target.data_file.name:
+        return None
+    if not isinstance(output.parsed_data, dict) or not isinstance(target.parsed_data, dict):
+        return None
+    if not same_json(without_namespaces(output.parsed_data), without_namespaces(target.parsed_data)):
+        return None
+    alias: dict = {"same_as": target.id}
+    if "_ns" in output.parsed_data:
+        if not same_json(output.parsed_data["_ns"], target.parsed_data.get("_ns")):
+            alias["_ns"] = output.parsed_data["_ns"]
+    elif "_ns" in target.parsed_data:
+        # An alias can replace the target's `_ns` but not remove it.
+        return None
+    # Tiny payloads are not worth an indirection.
+    if len(encode_alias(alias)) >= original_size:
+        return None
+    # Differing generate code stays in the alias directory; code shared with
+    # the system cannot be kept there, since the alias would use the target's.
+    if not same_generate_files(output, target) and not find_generate_files(output.path):
+        return None
+    return alias
+
+
+def plan_system_aliases(system: ExampleSystem) -> list[tuple[ExampleOutput, ExampleOutput, dict]]:
+    candidates = [
+        output
+        for output in system.outputs.values()
+        if output.alias_of is None
+        and isinstance(output.parsed_data, dict)
+        and output.path != system.path
+    ]
+    # Newest first, so older releases point at the most recent copy.
+    candidates.sort(key=lambda output: profile_sort_key(output.id), reverse=True)
+
+    kept: list[ExampleOutput] = []
+    plans = []
+    for output in candidates:
+        assert output.data_file is not None
+        original_size = output.data_file.stat().st_size
+        for target in kept:
+            alias = alias_for(output, target, original_size)
+            if alias is not None:
+                plans.append((output, target, alias))
+                break
+        else:
+            kept.append(output)
+    return plans
+
+
+def convert_to_alias(output: ExampleOutput, target: ExampleOutput, alias: dict) -> int:
+    assert output.data_file is not None
+    removed = [output.data_file]
+    if same_generate_files(output, target):
+        removed.extend(find_generate_files(output.path))
+    saved = sum(path.stat().st_size for path in removed)
+    alias_data = encode_alias(alias)
+    (output.path / OUTPUT_ALIAS_FILE).write_bytes(alias_data)
+    for path in removed:
+        path.unlink()
+    return saved - len(alias_data)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Replace output directories whose payload equals another profile's output "
+            "apart from the top-level _ns with aliases."
+        )
+    )
+    parser.add_argument(
+        "--example",
+        action="append",
+        default=[],
+        metavar="ID",
+        help="only convert outputs of this example (repeatable)",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="report duplicates without changing files")
+    args = parser.parse_args()
+
+    examples = discover_examples()
+    unknown = sorted(set(args.example) - set(examples))
+    if unknown:
+        parser.error(f"Error, unknown example ids: {', '.join(unknown)}")
+
+    converted = 0
+    saved = 0
+    for example_id, example in examples.items():
+        if args.example and example_id not in args.example:
+            continue
+        for system in example.systems.values():
+            for output, target, alias in plan_system_aliases(system):
+                print(f"{'Would alias' if args.dry_run else 'Aliased'} {output.path.relative_to(ROOT)} -> {target.id}")
+                converted += 1
+                if not args.dry_run:
+                    saved += convert_to_alias(output, target, alias)
+
+    if args.dry_run:
+        print(f"Found {converted} duplicate outputs.")
+    else:
+        print(f"Converted {converted} duplicate outputs to aliases, saving {saved} bytes.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
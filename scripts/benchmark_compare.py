@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+
+import argparse
+import copy
+from dataclasses import asdict, dataclass
+import itertools
+import json
+import random
+import sys
+import time
+from pathlib import Path
+import uuid
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+WEBPAGE_DIR = SCRIPT_DIR.parent / "webpage"
+if str(WEBPAGE_DIR) not in sys.path:
+    sys.path.insert(0, str(WEBPAGE_DIR))
+
+from mrdi_compare import CompareError, CompareState, CompareStats, compare_json, is_uuid_string
+
+NAMESPACE = {"Oscar": ["https://github.com/oscar-system/Oscar.jl", "1.7.0"]}
+
+# A case is flagged as a regression against a baseline when it got this much
+# slower (and by more than timer noise on tiny cases), or when it needs more
+# candidate attempts or state clones, which are deterministic.
+REGRESSION_RATIO = 1.5
+REGRESSION_MIN_MS = 5.0
+
+
+@dataclass(frozen=True)
+class BenchCase:
+    name: str
+    left: object
+    right: object
+    expected: bool | None
+    ignore_namespace_versions: bool = False
+
+
+@dataclass
+class BenchResult:
+    name: str
+    expected: bool | None
+    equivalent: bool
+    ms: float
+    candidate_attempts: int
+    clones: int
+
+
+def new_uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def rename_uuids(value, mapping: dict[str, str], rng: random.Random):
+    if isinstance(value, str):
+        if not is_uuid_string(value):
+            return value
+        if value not in mapping:
+            mapping[value] = new_uuid(rng)
+        return mapping[value]
+    if isinstance(value, list):
+        return [rename_uuids(item, mapping, rng) for item in value]
+    if isinstance(value, dict):
+        return {rename_uuids(key, mapping, rng): rename_uuids(item, mapping, rng) for key, item in value.items()}
+    return value
+
+
+def renamed_copy(payload, rng: random.Random):
+    # Consistent UUID renaming plus a shuffled _refs order: equivalent, but
+    # nothing lines up by position or by key.
+    renamed = rename_uuids(payload, {}, rng)
+    if isinstance(renamed, dict) and isinstance(renamed.get("_refs"), dict):
+        items = list(renamed["_refs"].items())
+        rng.shuffle(items)
+        renamed["_refs"] = dict(items)
+    return renamed
+
+
+def ref_payload(rng: random.Random, count: int, *, uniform: bool, fanout: int, row_length: int = 8):
+    ids = [new_uuid(rng) for _ in range(count)]
+    refs = {}
+    for index, ref_id in enumerate(ids):
+        params = [ids[rng.randrange(index)] for _ in range(min(fanout, index))]
+        prefix = "x" if uniform else f"x{index}_"
+        refs[ref_id] = {
+            "_type": "PolyRing",
+            "data": {
+                "base_ring": ids[index - 1] if index else {"_type": "QQField"},
+                "params": params,
+                "symbols": [f"{prefix}{column}" for column in range(row_length)],
+            },
+        }
+    return {
+        "_ns": NAMESPACE,
+        "_type": {"name": "Vector", "params": ids[-1]},
+        "data": [[str(rng.randrange(100)) for _ in range(row_length)] for _ in range(count)],
+        "_refs": refs,
+    }
+
+
+def mutate_last_ref(payload):
+    mutated = copy.deepcopy(payload)
+    last_ref = list(mutated["_refs"].values())[-1]
+    last_ref["data"]["symbols"][-1] += "'"
+    return mutated
+
+
+def generated_cases(size: int, seed: int) -> list[BenchCase]:
+    rng = random.Random(seed)
+    cases = []
+
+    long_list = {"_ns": NAMESPACE, "_type": "Vector", "data": [str(rng.randrange(10**6)) for _ in range(size * 500)]}
+    cases.append(BenchCase(f"long-list-{size * 500}", long_list, renamed_copy(long_list, rng), True))
+
+    uuid_list = {"_ns": NAMESPACE, "_type": "Vector", "data": [new_uuid(rng) for _ in range(size * 50)]}
+    renamed_uuid_list = renamed_copy(uuid_list, rng)
+    cases.append(BenchCase(f"long-uuid-list-{size * 50}", uuid_list, renamed_uuid_list, True))
+    clashing = copy.deepcopy(renamed_uuid_list)
+    clashing["data"][-1] = clashing["data"][-2]
+    cases.append(BenchCase(f"near-miss-uuid-clash-{size * 50}", uuid_list, clashing, False))
+
+    for label, uniform, fanout in (
+        ("refs-distinct", False, 0),
+        ("refs-uniform", True, 0),
+        ("refs-shared-params", True, 3),
+    ):
+        payload = ref_payload(rng, size, uniform=uniform, fanout=fanout)
+        renamed = renamed_copy(payload, rng)
+        cases.append(BenchCase(f"{label}-{size}", payload, renamed, True))
+        cases.append(BenchCase(f"near-miss-{label}-{size}", payload, mutate_last_ref(renamed), False))
+
+    versioned = ref_payload(rng, size, uniform=False, fanout=2)
+    other_version = renamed_copy(versioned, rng)
+    other_version["_ns"] = {"Oscar": ["https://github.com/oscar-system/Oscar.jl", "1.8.0"]}
+    cases.append(BenchCase(f"namespace-version-{size}", versioned, other_version, True, ignore_namespace_versions=True))
+    return cases
+
+
+def corpus_cases() -> list[BenchCase]:
+    from discovery import discover_examples
+
+    cases = []
+    for example_id, example in discover_examples().items():
+        for system_name, system in example.systems.items():
+            outputs = [output for output in system.outputs.values() if output.parsed_data is not None]
+            for left, right in itertools.combinations(outputs, 2):
+                cases.append(
+                    BenchCase(
+                        f"{example_id}/{system_name}:{left.id}~{right.id}",
+                        left.parsed_data,
+                        right.parsed_data,
+                        None,
+                        ignore_namespace_versions=True,
+                    )
+                )
+    return cases
+
+
+def run_case(case: BenchCase, repeat: int) -> BenchResult:
+    best = float("inf")
+    equivalent = False
+    stats = CompareStats()
+    for _ in range(repeat):
+        stats = CompareStats()
+        state = CompareState(ignore_namespace_versions=case.ignore_namespace_versions, stats=stats)
+        started = time.perf_counter()
+        try:
+            compare_json(case.left, case.right, "$", state)
+            equivalent = True
+        except CompareError:
+            equivalent = False
+        best = min(best, time.perf_counter() - started)
+    return BenchResult(case.name, case.expected, equivalent, best * 1000.0, stats.candidate_attempts, stats.clones)
+
+
+def format_result(result: BenchResult, flags: list[str]) -> str:
+    verdict = "equivalent" if result.equivalent else "different"
+    suffix = f"  {' '.join(flags)}" if flags else ""
+    return (
+        f"{result.name}: {verdict}, {result.ms:.2f} ms, "
+        f"{result.candidate_attempts} attempts, {result.clones} clones{suffix}"
+    )
+
+
+def regressions(result: BenchResult, baseline: dict[str, dict]) -> list[str]:
+    previous = baseline.get(result.name)
+    if previous is None:
+        return []
+    flags = []
+    if result.ms > previous["ms"] * REGRESSION_RATIO and result.ms - previous["ms"] > REGRESSION_MIN_MS:
+        flags.append(f"SLOWER({previous['ms']:.2f} ms)")
+    if result.candidate_attempts > previous["candidate_attempts"]:
+        flags.append(f"MORE-ATTEMPTS({previous['candidate_attempts']})")
+    if result.clones > previous["clones"]:
+        flags.append(f"MORE-CLONES({previous['clones']})")
+    if result.equivalent != previous["equivalent"]:
+        flags.append("RESULT-CHANGED")
+    return flags
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark mrdi_compare on adversarial payloads and on every pair of corpus outputs."
+    )
+    parser.add_argument("--size", type=int, default=200, help="number of _refs entries in generated cases")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (best is reported)")
+    parser.add_argument("--worst", type=int, default=5, help="number of slowest corpus pairs to list")
+    parser.add_argument("--no-corpus", action="store_true", help="skip replaying corpus pairs")
+    parser.add_argument("--output", type=Path, help="write all results as JSON, e.g. as a baseline")
+    parser.add_argument("--baseline", type=Path, help="flag regressions against results written by --output")
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline else {}
+    failed = False
+
+    generated = [run_case(case, args.repeat) for case in generated_cases(args.size, args.seed)]
+    slowest = max(generated, key=lambda result: result.ms)
+    print("Generated cases:")
+    for result in generated:
+        flags = regressions(result, baseline)
+        if result.expected is not None and result.equivalent != result.expected:
+            flags.append(f"WRONG(expected {'equivalent' if result.expected else 'different'})")
+        if result is slowest:
+            flags.append("WORST")
+        failed = failed or any(not flag.startswith("WORST") for flag in flags)
+        print("  " + format_result(result, flags))
+
+    results = list(generated)
+    if not args.no_corpus:
+        replayed = [run_case(case, args.repeat) for case in corpus_cases()]
+        results.extend(replayed)
+        total_ms = sum(result.ms for result in replayed)
+        equivalent = sum(1 for result in replayed if result.equivalent)
+        print(
+            f"Corpus pairs: {len(replayed)} compared in {total_ms:.1f} ms, {equivalent} equivalent, "
+            f"{sum(result.candidate_attempts for result in replayed)} attempts, "
+            f"{sum(result.clones for result in replayed)} clones"
+        )
+        regressed = []
+        for result in replayed:
+            flags = regressions(result, baseline)
+            if flags:
+                regressed.append((result, flags))
+        for result in sorted(replayed, key=lambda result: result.ms, reverse=True)[: args.worst]:
+            print("  worst " + format_result(result, []))
+        for result, flags in regressed:
+            print("  " + format_result(result, flags))
+        failed = failed or bool(regressed)
+
+    if args.output:
+        args.output.write_text(
+            json.dumps({result.name: asdict(result) for result in results}, indent=2, sort_keys=True) + "\n",
+            encoding="utf-8",
+        )
+        print(f"Wrote {args.output}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+WEBPAGE_DIR = SCRIPT_DIR.parent / "webpage"
+
+DEFAULT_MODULES = ["settings", "mrdi_compare", "utils", "discovery"]
+
+# Generous enough for noisy CI machines; reading config.json or the profile
+# sources at import time is reported as a failure regardless of the timing.
+DEFAULT_BUDGET_MS = 100.0
+
+MEASURE_SOURCE = """
+import sys, time
+sys.path.insert(0, {webpage_dir!r})
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+settings = sys.modules.get("settings")
+loaded = settings is not None and "profile_definitions" in vars(settings.SETTINGS)
+print(elapsed * 1000.0, int(loaded))
+"""
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Measure the import time of webpage modules in fresh interpreters."
+    )
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="modules to import")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per module")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help="fail if the best import time of any module exceeds this budget",
+    )
+    return parser.parse_args()
+
+
+def measure_import(module: str) -> tuple[float, bool]:
+    source = MEASURE_SOURCE.format(webpage_dir=str(WEBPAGE_DIR), module=module)
+    output = subprocess.run(
+        [sys.executable, "-c", source],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+    return float(output[0]), output[1] == "1"
+
+
+def main() -> int:
+    args = parse_args()
+    over_budget = []
+    for module in args.modules:
+        timings = []
+        loaded_profiles = False
+        for _ in range(args.repeat):
+            elapsed, loaded_profiles = measure_import(module)
+            timings.append(elapsed)
+        best = min(timings)
+        note = " (loaded profiles at import)" if loaded_profiles else ""
+        print(f"{module}: best {best:.1f} ms, median {sorted(timings)[len(timings) // 2]:.1f} ms{note}")
+        if best > args.budget_ms or loaded_profiles:
+            over_budget.append(module)
+
+    if over_budget:
+        print(f"Error, import budget of {args.budget_ms:.0f} ms exceeded by: {', '.join(over_budget)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
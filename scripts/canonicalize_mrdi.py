@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import json
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+WEBPAGE_DIR = SCRIPT_DIR.parent / "webpage"
+if str(WEBPAGE_DIR) not in sys.path:
+    sys.path.insert(0, str(WEBPAGE_DIR))
+
+from mrdi_canonical import canonicalize_payload, encode_canonical, without_namespace_versions
+from mrdi_compare import CompareError, CompareState, compare_json
+from settings import ROOT, ROSETTA_SOURCE_DIR
+
+DATA_SUFFIXES = {".json", ".mrdi"}
+
+
+def find_payload_files(paths: list[Path]) -> list[Path]:
+    files = set()
+    for path in paths:
+        if path.is_dir():
+            files.update(
+                candidate
+                for candidate in path.rglob("data.*")
+                if candidate.is_file() and candidate.suffix in DATA_SUFFIXES
+            )
+        else:
+            files.add(path)
+    return sorted(files)
+
+
+def canonicalize_file(path: Path, *, strip_versions: bool = False) -> tuple[bytes, bytes | None, str | None]:
+    original = path.read_bytes()
+    try:
+        payload = json.loads(original)
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        return original, None, f"Error, {path} is not valid JSON: {exc}"
+    if strip_versions:
+        payload = without_namespace_versions(payload)
+    canonical = canonicalize_payload(payload)
+    # Never rewrite a file into something mrdi_compare would not accept as
+    # the same payload.
+    try:
+        compare_json(payload, canonical, "$", CompareState())
+    except CompareError as exc:
+        return original, None, f"Error, canonical form of {path} is not equivalent: {exc}"
+    return original, encode_canonical(canonical), None
+
+
+def process_file(path: Path, *, strip_versions: bool, in_place: bool) -> tuple[bool, str | None]:
+    original, canonical, error = canonicalize_file(path, strip_versions=strip_versions)
+    if canonical is None:
+        return False, error
+    changed = canonical != original
+    if changed and in_place:
+        path.write_bytes(canonical)
+    return changed, None
+
+
+def display_path(path: Path) -> str:
+    resolved = path.resolve()
+    return str(resolved.relative_to(ROOT)) if resolved.is_relative_to(ROOT) else str(path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Rewrite .mrdi/.json payloads into a canonical form: sorted keys and UUIDs renumbered "
+            "by first occurrence, so equivalent payloads become byte-identical."
+        )
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        help="payload files, or directories searched for data.* files (default: the rosetta tree)",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--in-place", action="store_true", help="rewrite files that are not canonical")
+    mode.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="list files that are not canonical without changing them; exit 1 if there are any",
+    )
+    parser.add_argument(
+        "--strip-namespace-versions",
+        action="store_true",
+        help="drop version strings from _ns entries",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    args = parser.parse_args()
+
+    paths = args.paths or [ROSETTA_SOURCE_DIR]
+    missing = [str(path) for path in paths if not path.exists()]
+    if missing:
+        parser.error(f"Error, paths do not exist: {', '.join(missing)}")
+    files = find_payload_files(paths)
+
+    if not args.in_place and not args.dry_run:
+        # Without a mode the canonical form of a single file goes to stdout.
+        if len(files) != 1:
+            parser.error("Error, pass exactly one file, or use --in-place or --dry-run")
+        _, canonical, error = canonicalize_file(files[0], strip_versions=args.strip_namespace_versions)
+        if canonical is None:
+            print(error, file=sys.stderr)
+            return 1
+        sys.stdout.buffer.write(canonical + b"\n")
+        return 0
+
+    worker = partial(process_file, strip_versions=args.strip_namespace_versions, in_place=args.in_place)
+    changed = 0
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for path, (was_changed, error) in zip(files, executor.map(worker, files, chunksize=16)):
+            if error is not None:
+                print(error, file=sys.stderr)
+                failed += 1
+            elif was_changed:
+                changed += 1
+                print(f"{'Would rewrite' if args.dry_run else 'Rewrote'} {display_path(path)}")
+
+    verb = "are not canonical" if args.dry_run else "rewritten"
+    print(f"{changed} of {len(files)} files {verb}, {failed} failed.")
+    if failed:
+        return 1
+    return 1 if args.dry_run and changed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -13,6 +13,7 @@ if str(WEBPAGE_DIR) not in sys.path:
     sys.path.insert(0, str(WEBPAGE_DIR))
 
 from mrdi_compare import CompareError, compare_json, CompareState
+from mrdi_paths import POLYMAKE_VOLATILE_PATTERNS, PathPatternError, compile_ignore_rules
 
 
 def load_json(path: Path) -> object:
@@ -24,6 +25,7 @@ def compare_files(
     right_path: Path,
     *,
     ignore_namespace_versions: bool = False,
+    ignore_paths: tuple[str, ...] = (),
 ) -> None:
     left = load_json(left_path)
     right = load_json(right_path)
@@ -31,7 +33,10 @@ def compare_files(
         left,
         right,
         "$",
-        CompareState(ignore_namespace_versions=ignore_namespace_versions),
+        CompareState(
+            ignore_namespace_versions=ignore_namespace_versions,
+            ignore_paths=ignore_paths,
+        ),
     )
 
 
@@ -46,13 +51,34 @@ def main() -> int:
         action="store_true",
         help="ignore version strings in _ns entries",
     )
+    parser.add_argument(
+        "--ignore",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="ignore subtrees matching a path pattern such as '**._info.credits' (repeatable)",
+    )
+    parser.add_argument(
+        "--ignore-polymake-volatile",
+        action="store_true",
+        help="ignore polymake _info.credits, _info.description and _attrs subtrees",
+    )
     args = parser.parse_args()
 
+    ignore_paths = tuple(args.ignore)
+    if args.ignore_polymake_volatile:
+        ignore_paths += POLYMAKE_VOLATILE_PATTERNS
+    try:
+        compile_ignore_rules(ignore_paths)
+    except PathPatternError as exc:
+        parser.error(str(exc))
+
     try:
         compare_files(
             args.left,
             args.right,
             ignore_namespace_versions=args.ignore_namespace_versions,
+            ignore_paths=ignore_paths,
         )
     except CompareError as exc:
         print(f"NOT EQUIVALENT: {exc}", file=sys.stderr)
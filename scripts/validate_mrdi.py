@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+WEBPAGE_DIR = SCRIPT_DIR.parent / "webpage"
+if str(WEBPAGE_DIR) not in sys.path:
+    sys.path.insert(0, str(WEBPAGE_DIR))
+
+from discovery import OUTPUT_ALIAS_FILE, discover_examples, output_payload_bytes
+from models import ExampleOutput
+from mrdi_schema import ValidationResult, validate_files, validate_payload
+from settings import ROOT
+
+
+def discovered_payloads() -> tuple[list[Path], list[ExampleOutput]]:
+    # Aliases share the target's data file but carry their own `_ns`, so
+    # their payloads are validated separately.
+    paths = set()
+    aliases = []
+    for example in discover_examples().values():
+        for system in example.systems.values():
+            for output in system.outputs.values():
+                if output.data_file is None or output.data_file.suffix not in {".json", ".mrdi"}:
+                    continue
+                if output.alias_of is not None:
+                    aliases.append(output)
+                else:
+                    paths.add(output.data_file)
+    return sorted(paths), aliases
+
+
+def validate_alias(output: ExampleOutput) -> ValidationResult:
+    raw = output_payload_bytes(output)
+    return ValidationResult(
+        output.path / OUTPUT_ALIAS_FILE,
+        hashlib.sha256(raw).hexdigest(),
+        tuple(validate_payload(json.loads(raw))),
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Validate serialized payloads against the MaRDI JSON schema."
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        help="files to validate (default: every discovered output)",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.paths:
+        results = validate_files([path.resolve() for path in args.paths], workers=args.workers)
+    else:
+        paths, aliases = discovered_payloads()
+        results = validate_files(paths, workers=args.workers)
+        results.extend(validate_alias(output) for output in aliases)
+    failures = [result for result in results if not result.valid]
+
+    for result in failures:
+        try:
+            display_path = result.path.relative_to(ROOT)
+        except ValueError:
+            display_path = result.path
+        for error in result.errors:
+            print(f"INVALID {display_path}: {error}", file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    print(f"Validated {len(results)} payloads in {elapsed:.2f}s, {len(failures)} invalid.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
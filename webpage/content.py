@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+import io
+import os
 from pathlib import Path
 import re
 
@@ -92,33 +94,94 @@ class Frontmatter:
         return entry.line
 
 
-def parse_description(path: Path) -> tuple[Frontmatter, str]:
-    text = path.read_text(encoding="utf-8")
+# Frontmatter is scanned a chunk at a time so callers that only need the
+# header do not read the rest of the file.
+HEADER_READ_SIZE = 1024
+
+
+def parse_frontmatter_line(line: str, line_number: int, entries: dict[str, FrontmatterEntry]) -> None:
+    if ":" not in line:
+        return
+    key, value = line.split(":", 1)
+    key = key.strip()
+    value = value.strip()
+    if value.startswith("[") and value.endswith("]"):
+        items = [
+            item.strip().strip("'\"")
+            for item in value[1:-1].split(",")
+            if item.strip()
+        ]
+        entries[key] = FrontmatterEntry(value=items, line=line_number)
+    else:
+        entries[key] = FrontmatterEntry(value=value, line=line_number)
+
+
+FileKey = tuple[int, int]
+
+
+def file_key(stat: os.stat_result) -> FileKey:
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class MarkdownDocument:
+    def __init__(self, path: Path, frontmatter: Frontmatter, body_offset: int, key: FileKey):
+        self.path = path
+        self.frontmatter = frontmatter
+        self.body_offset = body_offset
+        # mtime and size of the file when its header was scanned.
+        self.key = key
+        self._body: str | None = None
+
+    @property
+    def body(self) -> str:
+        if self._body is None:
+            with self.path.open("rb") as handle:
+                if file_key(os.fstat(handle.fileno())) != self.key:
+                    # The file changed since it was scanned, so the offset is stale.
+                    self._body = scan_frontmatter(self.path).body
+                    return self._body
+                handle.seek(self.body_offset)
+                # Decoded with universal newlines, like Path.read_text.
+                text = io.TextIOWrapper(handle, encoding="utf-8").read()
+            self._body = text.lstrip()
+        return self._body
+
+
+def scan_frontmatter_file(path: Path) -> MarkdownDocument:
     entries: dict[str, FrontmatterEntry] = {}
-    body = text
-
-    if text.startswith("---\n"):
-        parts = text.split("\n---\n", 1)
-        if len(parts) == 2:
-            header_block = parts[0][4:]
-            body = parts[1]
-            for line_number, line in enumerate(header_block.splitlines(), start=2):
-                if ":" not in line:
-                    continue
-                key, value = line.split(":", 1)
-                key = key.strip()
-                value = value.strip()
-                if value.startswith("[") and value.endswith("]"):
-                    items = [
-                        item.strip().strip("'\"")
-                        for item in value[1:-1].split(",")
-                        if item.strip()
-                    ]
-                    entries[key] = FrontmatterEntry(value=items, line=line_number)
-                else:
-                    entries[key] = FrontmatterEntry(value=value, line=line_number)
-
-    return Frontmatter(path=path, entries=entries), body.lstrip()
+    with path.open("rb", buffering=HEADER_READ_SIZE) as handle:
+        key = file_key(os.fstat(handle.fileno()))
+        offset = 0
+        line = handle.readline()
+        if line.rstrip(b"\r\n") != b"---" or not line.endswith(b"\n"):
+            return MarkdownDocument(path, Frontmatter(path=path, entries={}), 0, key)
+        offset += len(line)
+        line_number = 2
+        for line in handle:
+            offset += len(line)
+            if line.endswith(b"\n") and line.rstrip(b"\r\n") == b"---":
+                return MarkdownDocument(path, Frontmatter(path=path, entries=entries), offset, key)
+            parse_frontmatter_line(line.decode("utf-8").rstrip("\r\n"), line_number, entries)
+            line_number += 1
+    # No closing marker: the whole file is body text.
+    return MarkdownDocument(path, Frontmatter(path=path, entries={}), 0, key)
+
+
+_DOCUMENT_CACHE: dict[Path, MarkdownDocument] = {}
+
+
+def scan_frontmatter(path: Path) -> MarkdownDocument:
+    cached = _DOCUMENT_CACHE.get(path)
+    if cached is not None and cached.key == file_key(path.stat()):
+        return cached
+    document = scan_frontmatter_file(path)
+    _DOCUMENT_CACHE[path] = document
+    return document
+
+
+def parse_description(path: Path) -> tuple[Frontmatter, str]:
+    document = scan_frontmatter(path)
+    return document.frontmatter, document.body
 
 
 def load_markdown_source(path: Path) -> str:
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+import hashlib
+import mmap
+from pathlib import Path
+import shutil
+import struct
+import tempfile
+from typing import BinaryIO
+
+from discovery import output_payload_bytes
+from models import ExampleOutput
+from site_writer import replace_if_changed, streamed_temp_path
+
+# Layout, all integers little-endian:
+#   header   magic, version, entry count, blob count, then the offsets of the
+#            key table, the entry table, the blob table and the payload data
+#   keys     "example\0system\0profile" UTF-8 strings, back to back
+#   entries  (key offset, key length, blob index), sorted by key bytes
+#   blobs    (payload offset, payload length), one per distinct payload
+#   data     payloads, each stored once and aligned to 8 bytes
+BUNDLE_MAGIC = b"RSBUNDLE"
+BUNDLE_VERSION = 1
+HEADER = struct.Struct("<8sIIIQQQQ")
+ENTRY = struct.Struct("<III")
+BLOB = struct.Struct("<QQ")
+KEY_SEPARATOR = b"\0"
+DATA_ALIGNMENT = 8
+
+
+class BundleError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class BundleKey:
+    example_id: str
+    system: str
+    profile: str
+
+    def encode(self) -> bytes:
+        return KEY_SEPARATOR.join(
+            part.encode("utf-8") for part in (self.example_id, self.system, self.profile)
+        )
+
+    @classmethod
+    def decode(cls, raw: bytes) -> BundleKey:
+        parts = raw.split(KEY_SEPARATOR)
+        if len(parts) != 3:
+            raise BundleError(f"Error, malformed bundle key {raw!r}")
+        example_id, system, profile = (part.decode("utf-8") for part in parts)
+        return cls(example_id, system, profile)
+
+
+@dataclass(frozen=True)
+class BundleStats:
+    entries: int
+    blobs: int
+    payload_bytes: int
+    bundle_bytes: int
+
+
+def bundle_payloads(examples) -> dict[BundleKey, ExampleOutput]:
+    payloads = {}
+    for example_id, example in examples.items():
+        for system_name, system in example.systems.items():
+            for output in system.outputs.values():
+                if output.data_file is not None:
+                    payloads[BundleKey(example_id, system_name, output.id)] = output
+    return payloads
+
+
+def pack_bundle(outputs: dict[BundleKey, ExampleOutput], handle: BinaryIO) -> BundleStats:
+    # Payloads are read one at a time and appended to a scratch data section;
+    # only the key and offset tables are kept in memory until the header can
+    # be written, after which the data section is copied in behind it.
+    encoded_keys = sorted((key.encode(), key) for key in outputs)
+
+    blob_index: dict[str, int] = {}
+    blob_spans: list[tuple[int, int]] = []
+    key_table = bytearray()
+    entries = bytearray()
+    payload_bytes = 0
+    with tempfile.TemporaryFile() as data:
+        data_size = 0
+        for raw_key, key in encoded_keys:
+            payload = output_payload_bytes(outputs[key])
+            payload_bytes += len(payload)
+            digest = hashlib.sha256(payload).hexdigest()
+            index = blob_index.get(digest)
+            if index is None:
+                index = len(blob_spans)
+                blob_index[digest] = index
+                blob_spans.append((data_size, len(payload)))
+                data.write(payload)
+                padding = _align(data_size + len(payload)) - data_size - len(payload)
+                data.write(b"\0" * padding)
+                data_size += len(payload) + padding
+            entries += ENTRY.pack(len(key_table), len(raw_key), index)
+            key_table += raw_key
+
+        keys_offset = HEADER.size
+        entries_offset = keys_offset + len(key_table)
+        blobs_offset = entries_offset + len(entries)
+        data_offset = _align(blobs_offset + BLOB.size * len(blob_spans))
+
+        blob_table = b"".join(BLOB.pack(data_offset + offset, length) for offset, length in blob_spans)
+        handle.write(
+            HEADER.pack(
+                BUNDLE_MAGIC,
+                BUNDLE_VERSION,
+                len(encoded_keys),
+                len(blob_spans),
+                keys_offset,
+                entries_offset,
+                blobs_offset,
+                data_offset,
+            )
+        )
+        handle.write(key_table)
+        handle.write(entries)
+        handle.write(blob_table)
+        handle.write(b"\0" * (data_offset - blobs_offset - len(blob_table)))
+        data.seek(0)
+        shutil.copyfileobj(data, handle)
+
+    return BundleStats(
+        entries=len(encoded_keys),
+        blobs=len(blob_spans),
+        payload_bytes=payload_bytes,
+        bundle_bytes=data_offset + data_size,
+    )
+
+
+def _align(offset: int) -> int:
+    return (offset + DATA_ALIGNMENT - 1) // DATA_ALIGNMENT * DATA_ALIGNMENT
+
+
+def write_corpus_bundle(examples, path: Path) -> BundleStats:
+    temp_path = streamed_temp_path(path)
+    try:
+        with temp_path.open("wb") as handle:
+            stats = pack_bundle(bundle_payloads(examples), handle)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    replace_if_changed(path, temp_path)
+    return stats
+
+
+class CorpusBundle:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with self.path.open("rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        # Views handed out by view() and profile_views() point into the
+        # mapping; callers release them before close(), which otherwise
+        # raises BufferError.
+        self._view = memoryview(self._mmap)
+        try:
+            (
+                magic,
+                version,
+                self.entry_count,
+                self.blob_count,
+                self._keys_offset,
+                self._entries_offset,
+                self._blobs_offset,
+                _,
+            ) = HEADER.unpack_from(self._mmap, 0)
+        except struct.error as exc:
+            self.close()
+            raise BundleError(f"Error, {self.path} is too short to be a corpus bundle") from exc
+        if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+            self.close()
+            raise BundleError(f"Error, {self.path} is not a version {BUNDLE_VERSION} corpus bundle")
+
+    def close(self) -> None:
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> CorpusBundle:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.entry_count
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, BundleKey) and self._find(key.encode()) is not None
+
+    def _entry(self, index: int) -> tuple[int, int, int]:
+        return ENTRY.unpack_from(self._mmap, self._entries_offset + index * ENTRY.size)
+
+    def _key_bytes(self, index: int) -> bytes:
+        key_offset, key_length, _ = self._entry(index)
+        start = self._keys_offset + key_offset
+        return self._mmap[start:start + key_length]
+
+    def _find(self, raw_key: bytes) -> int | None:
+        low, high = 0, self.entry_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_bytes(middle) < raw_key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.entry_count and self._key_bytes(low) == raw_key:
+            return low
+        return None
+
+    def _blob_span(self, entry_index: int) -> tuple[int, int]:
+        _, _, blob_index = self._entry(entry_index)
+        return BLOB.unpack_from(self._mmap, self._blobs_offset + blob_index * BLOB.size)
+
+    def _find_entry(self, example_id: str, system: str, profile: str) -> int:
+        index = self._find(BundleKey(example_id, system, profile).encode())
+        if index is None:
+            raise KeyError((example_id, system, profile))
+        return index
+
+    def _blob_view(self, entry_index: int) -> memoryview:
+        offset, length = self._blob_span(entry_index)
+        return self._view[offset:offset + length]
+
+    def keys(self) -> Iterator[BundleKey]:
+        for index in range(self.entry_count):
+            yield BundleKey.decode(self._key_bytes(index))
+
+    def view(self, example_id: str, system: str, profile: str) -> memoryview:
+        return self._blob_view(self._find_entry(example_id, system, profile))
+
+    def read(self, example_id: str, system: str, profile: str) -> bytes:
+        offset, length = self._blob_span(self._find_entry(example_id, system, profile))
+        return self._mmap[offset:offset + length]
+
+    def profile_views(self, profile: str) -> Iterator[tuple[BundleKey, memoryview]]:
+        for index in range(self.entry_count):
+            key = BundleKey.decode(self._key_bytes(index))
+            if key.profile == profile:
+                yield key, self._blob_view(index)
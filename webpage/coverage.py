@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+from settings import SETTINGS
+
+# Each (system, profile) cell holds a bitset over the example axis as a plain
+# int: bit i is set when examples[i] has that entry. Row, column and aggregate
+# queries reduce to &, | and int.bit_count() on a handful of ints.
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def profile_sort_key(profile_id: str) -> tuple[int, str]:
+    return (SETTINGS.profile_order.get(profile_id, 10_000), profile_id)
+
+
+@dataclass(frozen=True)
+class ProfileCoverage:
+    profile_id: str
+    declared: int
+    covered: int
+    unavailable: int
+    missing: list[str]
+
+
+class CoverageMatrix:
+    def __init__(self, examples):
+        self.example_ids: list[str] = list(examples)
+        self._example_index = {example_id: index for index, example_id in enumerate(self.example_ids)}
+        self._systems: dict[str, int] = {}
+        self._outputs: dict[tuple[str, str], int] = {}
+        self._declared: dict[str, int] = {}
+        self._unavailable: dict[str, int] = {}
+
+        profile_ids: set[str] = set()
+        for index, example in enumerate(examples.values()):
+            bit = 1 << index
+            for system_name, system in example.systems.items():
+                self._systems[system_name] = self._systems.get(system_name, 0) | bit
+                for output in system.outputs.values():
+                    if output.data_file is None:
+                        continue
+                    cell = (system_name, output.id)
+                    self._outputs[cell] = self._outputs.get(cell, 0) | bit
+                    profile_ids.add(output.id)
+            for profile_id in example.profiles:
+                self._declared[profile_id] = self._declared.get(profile_id, 0) | bit
+            for profile_id in example.unavailable_profiles:
+                self._unavailable[profile_id] = self._unavailable.get(profile_id, 0) | bit
+        profile_ids.update(self._declared, self._unavailable)
+
+        self.system_names: list[str] = sorted(self._systems)
+        self.profile_ids: list[str] = sorted(profile_ids, key=profile_sort_key)
+
+        # Every example with an output for the profile in any system. Shared
+        # profiles are only serialized through the application profiles based
+        # on them, so those outputs count towards the shared profile as well.
+        self._profile_outputs: dict[str, int] = {}
+        for (_, profile_id), mask in self._outputs.items():
+            self._profile_outputs[profile_id] = self._profile_outputs.get(profile_id, 0) | mask
+        for profile_id, definition in SETTINGS.profile_definitions.items():
+            mask = self._profile_outputs.get(profile_id, 0)
+            for base_id in definition.get("based_on", []):
+                self._profile_outputs[base_id] = self._profile_outputs.get(base_id, 0) | mask
+
+    def mask(self, example_ids: Iterable[str]) -> int:
+        mask = 0
+        for example_id in example_ids:
+            mask |= 1 << self._example_index[example_id]
+        return mask
+
+    def _bit(self, example_id: str) -> int:
+        return 1 << self._example_index[example_id]
+
+    def _decode(self, mask: int) -> list[str]:
+        return [self.example_ids[index] for index in iter_bits(mask)]
+
+    def has_system(self, example_id: str, system_name: str) -> bool:
+        return bool(self._systems.get(system_name, 0) & self._bit(example_id))
+
+    def has_output(self, example_id: str, system_name: str, profile_id: str) -> bool:
+        return bool(self._outputs.get((system_name, profile_id), 0) & self._bit(example_id))
+
+    def example_systems(self, example_id: str) -> list[str]:
+        bit = self._bit(example_id)
+        return [system_name for system_name in self.system_names if self._systems[system_name] & bit]
+
+    def output_profiles(self, example_id: str, system_name: str) -> list[str]:
+        bit = self._bit(example_id)
+        return [
+            profile_id
+            for profile_id in self.profile_ids
+            if self._outputs.get((system_name, profile_id), 0) & bit
+        ]
+
+    def unavailable_profiles(self, example_id: str) -> list[str]:
+        bit = self._bit(example_id)
+        return [profile_id for profile_id in self.profile_ids if self._unavailable.get(profile_id, 0) & bit]
+
+    def systems_covering(self, example_ids: Iterable[str]) -> list[str]:
+        mask = self.mask(example_ids)
+        return [system_name for system_name in self.system_names if self._systems[system_name] & mask]
+
+    def system_count(self, system_name: str, example_ids: Iterable[str]) -> int:
+        return (self._systems.get(system_name, 0) & self.mask(example_ids)).bit_count()
+
+    def profile_examples(self, profile_id: str) -> list[str]:
+        # Examples that declare the profile in their frontmatter.
+        return self._decode(self._declared.get(profile_id, 0))
+
+    def profile_coverage(self, profile_id: str) -> ProfileCoverage:
+        declared = self._declared.get(profile_id, 0)
+        covered = self._profile_outputs.get(profile_id, 0)
+        unavailable = self._unavailable.get(profile_id, 0)
+        return ProfileCoverage(
+            profile_id=profile_id,
+            declared=declared.bit_count(),
+            covered=(declared & covered).bit_count(),
+            unavailable=(declared & unavailable).bit_count(),
+            missing=self._decode(declared & ~covered & ~unavailable),
+        )
+
+
+def build_coverage_matrix(examples) -> CoverageMatrix:
+    return CoverageMatrix(examples)
+
+
+def coverage_report(matrix: CoverageMatrix) -> str:
+    lines = ["Coverage of declared profiles:"]
+    for profile_id in matrix.profile_ids:
+        coverage = matrix.profile_coverage(profile_id)
+        if not coverage.declared:
+            continue
+        lines.append(
+            f"  {profile_id}: {coverage.covered}/{coverage.declared} examples with outputs, "
+            f"{coverage.unavailable} unavailable, {len(coverage.missing)} missing"
+        )
+        for example_id in coverage.missing:
+            lines.append(f"    missing: {example_id}")
+    return "\n".join(lines)
@@ -2,58 +2,98 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
+import sys
 
-from content import parse_description
-from models import ExampleOutput, ExamplePage, ExampleSystem, Profile, SpecPage
-from settings import PROFILE_DEFINITIONS, ROSETTA_SOURCE_DIR, SPEC_SITE_DIR, SPEC_SOURCE_DIR, resolve_type_spec
+from content import scan_frontmatter
+from coverage import CoverageMatrix
+from mrdi_census import PayloadCensus, census_cache, census_payload
+from models import ExampleOutput, ExamplePage, ExampleSystem, Namespace, Profile, SpecPage
+from settings import ROSETTA_SOURCE_DIR, SETTINGS, SPEC_SITE_DIR, SPEC_SOURCE_DIR, resolve_type_spec
 
 
-def load_serialized_payload(path: Path | None):
+def load_serialized_payload(
+    path: Path | None,
+    keep_payload: bool = True,
+) -> tuple[dict | list | None, PayloadCensus | None]:
     if path is None or path.suffix not in {".json", ".mrdi"}:
-        return None
+        return None, None
+    raw = path.read_bytes()
+    if not keep_payload:
+        census = census_cache().cached(raw)
+        if census is not None:
+            return None, census
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        payload = json.loads(raw.decode("utf-8"))
     except json.JSONDecodeError:
+        return None, None
+    return payload, census_cache().census_for(raw, payload)
+
+
+_NAMESPACE_RECORDS: dict[tuple[str, str, str], Namespace] = {}
+
+
+def intern_optional(value: str | None) -> str | None:
+    return sys.intern(value) if value is not None else None
+
+
+def intern_namespace(name: str, url: str, version: str) -> Namespace:
+    # Many outputs share the same namespace entry, so they share one record.
+    key = (name, url, version)
+    record = _NAMESPACE_RECORDS.get(key)
+    if record is None:
+        record = Namespace(sys.intern(name), sys.intern(url), sys.intern(version))
+        _NAMESPACE_RECORDS[key] = record
+    return record
+
+
+def namespace_records(census: PayloadCensus | None) -> tuple[Namespace, ...]:
+    if census is None:
+        return ()
+    return tuple(intern_namespace(name, url, version) for name, url, version in census.root_namespaces)
+
+
+# An output directory holding this file instead of a data file stands for the
+# payload of another output of the same system, with its own top-level `_ns`
+# entry if one is given, e.g. {"same_as": "oscar-v1.7", "_ns": {...}}.
+OUTPUT_ALIAS_FILE = "alias.json"
+
+
+def load_output_alias(output_dir: Path) -> dict | None:
+    alias_path = output_dir / OUTPUT_ALIAS_FILE
+    if not alias_path.is_file():
+        return None
+    try:
+        alias = json.loads(alias_path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"Error, invalid output alias {alias_path}: {exc}") from exc
+    if not isinstance(alias, dict) or not isinstance(alias.get("same_as"), str):
+        raise ValueError(f"Error, output alias {alias_path} needs a 'same_as' output id")
+    return alias
+
+
+def aliased_payload(target_payload, alias: dict):
+    if "_ns" not in alias:
+        return target_payload
+    if not isinstance(target_payload, dict):
         return None
+    # Shallow copy: everything below the top level is shared with the target.
+    payload = dict(target_payload)
+    payload["_ns"] = alias["_ns"]
+    return payload
 
 
-def normalize_type_name(type_value) -> str | None:
-    if isinstance(type_value, str):
-        return type_value
-    if isinstance(type_value, dict):
-        name = type_value.get("name")
-        if isinstance(name, str):
-            return name
-    return None
-
-
-def extract_namespaces(parsed) -> list[dict[str, str]]:
-    namespaces: list[dict[str, str]] = []
-    if not isinstance(parsed, dict):
-        return namespaces
-
-    ns = parsed.get("_ns")
-    if not isinstance(ns, dict):
-        return namespaces
-
-    for namespace_name, value in ns.items():
-        url = ""
-        version = ""
-        if isinstance(value, list):
-            if len(value) >= 1:
-                url = str(value[0])
-            if len(value) >= 2:
-                version = str(value[1])
-        elif isinstance(value, str):
-            version = value
-        namespaces.append(
-            {
-                "name": namespace_name,
-                "url": url,
-                "version": version,
-            }
-        )
-    return namespaces
+def encode_payload(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def output_payload_bytes(output: ExampleOutput) -> bytes:
+    if output.data_file is None:
+        raise ValueError(f"Error, output {output.path} has no data file")
+    if output.alias_of is not None:
+        payload = output.parsed_data if output.parsed_data is not None else reload_output(output).parsed_data
+        if payload is not None:
+            return encode_payload(payload)
+    return output.data_file.read_bytes()
 
 
 def find_generate_files(path: Path) -> list[Path]:
@@ -77,41 +117,107 @@ def build_output(
     output_id: str,
     output_path: Path,
     generate_files: list[Path],
+    keep_payload: bool = True,
 ) -> ExampleOutput:
     data_file = find_data_file(output_path)
-    parsed_data = load_serialized_payload(data_file)
+    parsed_data, census = load_serialized_payload(data_file, keep_payload)
+    output_id = sys.intern(output_id)
     return ExampleOutput(
         id=output_id,
         path=output_path,
         data_file=data_file,
         generate_files=list(generate_files),
         parsed_data=parsed_data,
-        root_type=normalize_type_name(parsed_data.get("_type")) if isinstance(parsed_data, dict) else None,
-        namespaces=extract_namespaces(parsed_data),
+        root_type=intern_optional(census.root_type if census is not None else None),
+        namespaces=namespace_records(census),
         profile_id=output_id if output_id != "default" else None,
+        census=census,
     )
 
 
-def discover_system_outputs(system_dir: Path, example_profiles: list[str]) -> ExampleSystem:
+def build_alias_output(
+    output_id: str,
+    aliases: dict[str, tuple[Path, dict]],
+    outputs: dict[str, ExampleOutput],
+    chain: tuple[str, ...] = (),
+) -> ExampleOutput:
+    if output_id in outputs:
+        return outputs[output_id]
+    output_dir, alias = aliases[output_id]
+    target_id = alias["same_as"]
+    if target_id == output_id or target_id in chain:
+        raise ValueError(f"Error, output alias {output_dir / OUTPUT_ALIAS_FILE} is circular")
+    if target_id not in outputs and target_id not in aliases:
+        raise ValueError(
+            f"Error, output alias {output_dir / OUTPUT_ALIAS_FILE} refers to missing output '{target_id}'"
+        )
+    target = build_alias_output(target_id, aliases, outputs, chain + (output_id,))
+    parsed_data = aliased_payload(target.parsed_data, alias)
+    if parsed_data is None and target.parsed_data is not None:
+        raise ValueError(
+            f"Error, output alias {output_dir / OUTPUT_ALIAS_FILE} sets '_ns' but '{target_id}' is not a JSON object"
+        )
+    # Only the top-level `_ns` differs from the target, and there is no file
+    # of its own to key a cached census by.
+    census = census_payload(parsed_data) if "_ns" in alias and parsed_data is not None else target.census
+    output_id = sys.intern(output_id)
+    outputs[output_id] = ExampleOutput(
+        id=output_id,
+        path=output_dir,
+        data_file=target.data_file,
+        generate_files=find_generate_files(output_dir) or list(target.generate_files),
+        parsed_data=parsed_data,
+        root_type=target.root_type,
+        namespaces=namespace_records(census) if "_ns" in alias else target.namespaces,
+        profile_id=output_id if output_id != "default" else None,
+        alias_of=sys.intern(target_id),
+        census=census,
+    )
+    return outputs[output_id]
+
+
+def discover_system_outputs(
+    system_dir: Path,
+    example_profiles: list[str],
+    keep_payloads: bool = True,
+) -> ExampleSystem:
     shared_generate_files = find_generate_files(system_dir)
     outputs: dict[str, ExampleOutput] = {}
     outputs_root = system_dir / "outputs"
 
     if outputs_root.exists():
         output_dirs = sorted(path for path in outputs_root.iterdir() if path.is_dir())
+        aliases: dict[str, tuple[Path, dict]] = {}
+        for output_dir in output_dirs:
+            alias = load_output_alias(output_dir)
+            if alias is not None:
+                aliases[output_dir.name] = (output_dir, alias)
+        # Without payloads a cached census saves parsing the file at all,
+        # except for alias targets, whose payload the aliases are built from.
+        alias_targets = {alias["same_as"] for _, alias in aliases.values()}
         for output_dir in output_dirs:
+            if output_dir.name in aliases:
+                continue
             output_generate_files = find_generate_files(output_dir) or shared_generate_files
             outputs[output_dir.name] = build_output(
                 output_dir.name,
                 output_dir,
                 output_generate_files,
+                keep_payloads or output_dir.name in alias_targets,
             )
+        if aliases:
+            # Aliases reuse the already parsed target payload, so duplicate
+            # bytes are never read; keep the directory order afterwards.
+            for output_id in aliases:
+                build_alias_output(output_id, aliases, outputs)
+            outputs = {output_dir.name: outputs[output_dir.name] for output_dir in output_dirs}
         if not output_dirs and find_data_file(system_dir) is not None:
             legacy_output_id = infer_legacy_output_id(example_profiles)
             outputs[legacy_output_id] = build_output(
                 legacy_output_id,
                 system_dir,
                 shared_generate_files,
+                keep_payloads,
             )
     else:
         legacy_output_id = infer_legacy_output_id(example_profiles)
@@ -119,8 +225,14 @@ def discover_system_outputs(system_dir: Path, example_profiles: list[str]) -> Ex
             legacy_output_id,
             system_dir,
             shared_generate_files,
+            keep_payloads,
         )
 
+    if not keep_payloads:
+        # Metadata only: root types, namespaces and the census stay.
+        for output in outputs.values():
+            output.parsed_data = None
+
     return ExampleSystem(
         path=system_dir,
         shared_generate_files=shared_generate_files,
@@ -128,62 +240,81 @@ def discover_system_outputs(system_dir: Path, example_profiles: list[str]) -> Ex
     )
 
 
-def discover_examples() -> dict[str, ExamplePage]:
+def discover_example(example_dir: Path, keep_payloads: bool = True) -> ExamplePage | None:
+    description_path = example_dir / "description.md"
+    if not description_path.exists():
+        return None
+
+    group_id = example_dir.parent.name
+    document = scan_frontmatter(description_path)
+    metadata = document.frontmatter
+    example_profiles = [sys.intern(profile_id) for profile_id in metadata.str_list("profiles")]
+    example_slug = example_dir.name
+    example_id = f"{group_id}-{example_slug}"
+
+    systems: dict[str, ExampleSystem] = {}
+    systems_root = example_dir / "systems"
+    if systems_root.exists():
+        for system_dir in sorted(path for path in systems_root.iterdir() if path.is_dir()):
+            systems[system_dir.name] = discover_system_outputs(system_dir, example_profiles, keep_payloads)
+
+    parsed_order = metadata.optional_int("order")
+
+    return ExamplePage(
+        id=example_id,
+        slug=example_slug,
+        output_relpath_md=f"rosetta/{group_id}/{example_slug}.md",
+        path=description_path,
+        title=metadata.require_str("title", example_slug),
+        category=sys.intern(
+            metadata.require_str(
+                "category",
+                metadata.require_str("group", group_id),
+            )
+        ),
+        subcategory=intern_optional(metadata.optional_str("subcategory")),
+        order=parsed_order,
+        profiles=example_profiles,
+        document=document,
+        systems=systems,
+        unavailable_profiles=[
+            sys.intern(profile_id) for profile_id in metadata.str_list("unavailable_profiles")
+        ],
+        unavailable_note=metadata.optional_str("unavailable_note"),
+    )
+
+
+def discover_examples(keep_payloads: bool = True) -> dict[str, ExamplePage]:
     examples: dict[str, ExamplePage] = {}
     for group_dir in sorted(path for path in ROSETTA_SOURCE_DIR.iterdir() if path.is_dir()):
-        group_id = group_dir.name
         for example_dir in sorted(path for path in group_dir.iterdir() if path.is_dir()):
-            description_path = example_dir / "description.md"
-            if not description_path.exists():
-                continue
-
-            metadata, body = parse_description(description_path)
-            example_profiles = metadata.str_list("profiles")
-            example_slug = example_dir.name
-            example_id = f"{group_id}-{example_slug}"
-
-            systems: dict[str, ExampleSystem] = {}
-            systems_root = example_dir / "systems"
-            if systems_root.exists():
-                for system_dir in sorted(path for path in systems_root.iterdir() if path.is_dir()):
-                    systems[system_dir.name] = discover_system_outputs(system_dir, example_profiles)
-
-            parsed_order = metadata.optional_int("order")
-
-            examples[example_id] = ExamplePage(
-                id=example_id,
-                slug=example_slug,
-                output_relpath_md=f"rosetta/{group_id}/{example_slug}.md",
-                path=description_path,
-                title=metadata.require_str("title", example_slug),
-                category=metadata.require_str(
-                    "category",
-                    metadata.require_str("group", group_id),
-                ),
-                subcategory=metadata.optional_str("subcategory"),
-                order=parsed_order,
-                profiles=example_profiles,
-                body=body,
-                systems=systems,
-                unavailable_profiles=metadata.str_list("unavailable_profiles"),
-                unavailable_note=metadata.optional_str("unavailable_note"),
-            )
+            example = discover_example(example_dir, keep_payloads)
+            if example is not None:
+                examples[example.id] = example
+    census_cache().save()
     return examples
 
 
-def build_system_index(examples: dict[str, ExamplePage]) -> dict[str, dict[str, ExampleSystem]]:
-    systems: dict[str, dict[str, ExampleSystem]] = {}
-    for example_id, example in examples.items():
-        for system_name, files in example.systems.items():
-            systems.setdefault(system_name, {})
-            systems[system_name][example_id] = files
-    return systems
+def load_example(example: ExamplePage) -> ExamplePage:
+    # Rediscovers an example found without payloads, keeping the cross-page
+    # state that was attached to it since.
+    loaded = discover_example(example.path.parent)
+    assert loaded is not None
+    loaded.spec_ids = example.spec_ids
+    return loaded
+
+
+def reload_output(output: ExampleOutput) -> ExampleOutput:
+    # Aliases only exist under <system>/outputs/, so the legacy output id
+    # inferred from the example profiles does not matter here.
+    return discover_system_outputs(output.path.parent.parent, []).outputs[output.id]
 
 
 def discover_spec_pages() -> dict[str, SpecPage]:
     spec_pages: dict[str, SpecPage] = {}
     for spec_path in sorted(SPEC_SOURCE_DIR.rglob("*.md")):
-        metadata, body = parse_description(spec_path)
+        document = scan_frontmatter(spec_path)
+        metadata = document.frontmatter
         parsed_order = metadata.optional_int("order")
 
         relpath = spec_path.relative_to(SPEC_SOURCE_DIR)
@@ -192,13 +323,15 @@ def discover_spec_pages() -> dict[str, SpecPage]:
             id=spec_id,
             title=metadata.require_str("title", spec_id.replace("-", " ").title()),
             concept_id=metadata.optional_str("concept"),
-            kind=metadata.require_str("kind", "type"),
+            kind=sys.intern(metadata.require_str("kind", "type")),
             order=parsed_order,
-            profiles=metadata.str_list("profiles"),
-            body=body.rstrip(),
-            section=metadata.require_str(
-                "section",
-                relpath.parent.as_posix() if relpath.parent != Path(".") else "",
+            profiles=[sys.intern(profile_id) for profile_id in metadata.str_list("profiles")],
+            document=document,
+            section=sys.intern(
+                metadata.require_str(
+                    "section",
+                    relpath.parent.as_posix() if relpath.parent != Path(".") else "",
+                )
             ),
             source_path=spec_path,
             path_md=SPEC_SITE_DIR / relpath,
@@ -215,7 +348,7 @@ def build_spec_catalog(spec_pages: dict[str, SpecPage], examples: dict[str, Exam
             kind=spec.kind,
             order=spec.order,
             profiles=list(spec.profiles),
-            body=spec.body,
+            document=spec.document,
             section=spec.section,
             source_path=spec.source_path,
             path_md=spec.path_md,
@@ -231,8 +364,7 @@ def build_spec_catalog(spec_pages: dict[str, SpecPage], examples: dict[str, Exam
                 if spec_id:
                     related_specs.add(spec_id)
 
-                parsed_data = output.parsed_data
-                if isinstance(parsed_data, dict) and parsed_data.get("_refs"):
+                if output.census is not None and output.census.has_refs:
                     related_specs.add("core/references-and-parameters")
 
         example.spec_ids = sorted(related_specs)
@@ -245,7 +377,7 @@ def build_spec_catalog(spec_pages: dict[str, SpecPage], examples: dict[str, Exam
 
 def build_profile_catalog(
     spec_pages: dict[str, SpecPage],
-    examples: dict[str, ExamplePage],
+    coverage: CoverageMatrix,
 ) -> dict[str, Profile]:
     catalog = {
         profile_id: Profile(
@@ -257,7 +389,7 @@ def build_profile_catalog(
             description=definition["description"],
             released_on=definition.get("released_on"),
         )
-        for profile_id, definition in PROFILE_DEFINITIONS.items()
+        for profile_id, definition in SETTINGS.profile_definitions.items()
     }
 
     for spec_id, spec_page in spec_pages.items():
@@ -265,9 +397,7 @@ def build_profile_catalog(
             if profile_id in catalog:
                 catalog[profile_id].spec_ids.append(spec_id)
 
-    for example_id, example in examples.items():
-        for profile_id in example.profiles:
-            if profile_id in catalog:
-                catalog[profile_id].example_ids.append(example_id)
+    for profile_id, profile in catalog.items():
+        profile.example_ids.extend(coverage.profile_examples(profile_id))
 
     return catalog
@@ -1,56 +1,367 @@
 #!/usr/bin/env python3
-import shutil
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
 
-from discovery import build_profile_catalog, build_spec_catalog, build_system_index, discover_examples, discover_spec_pages
+from corpus_bundle import write_corpus_bundle
+from coverage import build_coverage_matrix, coverage_report
+from discovery import build_profile_catalog, build_spec_catalog, discover_examples, discover_spec_pages, load_example
 from html_renderer import render_html_page
-from rosetta_render import build_example_markdown, build_front_page_markdown, build_rosetta_index_markdown
-from settings import ROOT_INDEX_MD, ROSETTA_INDEX_MD, SITE_DIR, SPEC_INDEX_MD
+from link_check import check_links, link_report
+from memory_report import catalog_memory_report
+from mrdi_census import census_report
+from precompress import compression_report, precompress_site
+from rosetta_render import (
+    build_example_markdown,
+    build_front_page_markdown,
+    build_rosetta_index_markdown,
+    build_rosetta_shard_markdown,
+    plan_rosetta_index_shards,
+)
+from settings import CORPUS_BUNDLE_PATH, DEPLOY_MANIFEST_PATH, ROOT_INDEX_MD, ROSETTA_INDEX_MD, SITE_DIR, SPEC_INDEX_MD
+from site_writer import (
+    compressed_sibling,
+    prune_site,
+    remove_site_file,
+    write_deploy_manifest,
+    write_if_changed,
+    written_paths,
+)
 from spec_render import build_spec_index_markdown, build_spec_page_markdown
 
 
+OUTPUT_FORMATS = ("md", "html")
+
+
+@dataclass(frozen=True)
+class PageSelection:
+    example_ids: list[str]
+    spec_ids: list[str]
+    shard_ids: list[str]
+    front_page: bool
+    rosetta_index: bool
+    spec_index: bool
+    full: bool
+
+
+def site_path_matches(relpath: str, selector: str) -> bool:
+    # A page is selected by its Markdown or HTML path, or without suffix.
+    selector = selector.strip("/")
+    page = relpath.removesuffix(".md")
+    return (
+        relpath == selector
+        or page == selector
+        or page + ".html" == selector
+        or relpath.startswith(selector + "/")
+    )
+
+
+def select_pages(only, example_ids, examples, spec_catalog, shards) -> PageSelection:
+    if not only and not example_ids:
+        return PageSelection(
+            sorted(examples),
+            sorted(spec_catalog),
+            [shard.id for shard in shards],
+            True,
+            True,
+            True,
+            True,
+        )
+
+    selected_examples = set()
+    for example_id in example_ids:
+        if example_id not in examples:
+            raise ValueError(f"Error, unknown example {example_id!r}")
+        selected_examples.add(example_id)
+
+    selected_specs = set()
+    selected_shards = set()
+    front_page = False
+    rosetta_index = False
+    spec_index = False
+    for selector in only:
+        matched_examples = {
+            example_id
+            for example_id, example in examples.items()
+            if site_path_matches(example.output_relpath_md, selector)
+        }
+        matched_specs = {
+            spec_id
+            for spec_id, spec_page in spec_catalog.items()
+            if site_path_matches(spec_page.path_md.relative_to(SITE_DIR).as_posix(), selector)
+        }
+        matched_shards = {
+            shard.id
+            for shard in shards
+            if site_path_matches(shard.path_md.relative_to(SITE_DIR).as_posix(), selector)
+        }
+        matched_front_page = site_path_matches(ROOT_INDEX_MD.relative_to(SITE_DIR).as_posix(), selector)
+        matched_rosetta_index = site_path_matches(ROSETTA_INDEX_MD.relative_to(SITE_DIR).as_posix(), selector)
+        matched_spec_index = site_path_matches(SPEC_INDEX_MD.relative_to(SITE_DIR).as_posix(), selector)
+        if not (
+            matched_examples
+            or matched_specs
+            or matched_shards
+            or matched_front_page
+            or matched_rosetta_index
+            or matched_spec_index
+        ):
+            raise ValueError(f"Error, --only {selector!r} matches no pages")
+        selected_examples |= matched_examples
+        selected_specs |= matched_specs
+        selected_shards |= matched_shards
+        front_page = front_page or matched_front_page
+        rosetta_index = rosetta_index or matched_rosetta_index
+        spec_index = spec_index or matched_spec_index
+
+    # Index pages are rebuilt whenever one of the pages they list is; for the
+    # rosetta index that is only the shards holding the selected examples.
+    selected_shards |= {
+        shard.id
+        for shard in shards
+        if not selected_examples.isdisjoint(shard.example_ids)
+    }
+    return PageSelection(
+        example_ids=sorted(selected_examples),
+        spec_ids=sorted(selected_specs),
+        shard_ids=[shard.id for shard in shards if shard.id in selected_shards],
+        front_page=front_page,
+        rosetta_index=rosetta_index or bool(selected_examples or selected_shards),
+        spec_index=spec_index or bool(selected_specs),
+        full=False,
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate the static site under _site/.")
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="write .gz siblings for generated HTML, Markdown and payload files",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="collapse insignificant whitespace in generated HTML pages",
+    )
+    parser.add_argument(
+        "--bundle",
+        action="store_true",
+        help="write every serialized output into one packed corpus bundle",
+    )
+    parser.add_argument(
+        "--memory-report",
+        action="store_true",
+        help="print the in-memory size of the discovered catalogs",
+    )
+    parser.add_argument(
+        "--coverage-report",
+        action="store_true",
+        help="print, per profile, the examples that declare it but have no output for it",
+    )
+    parser.add_argument(
+        "--census-report",
+        action="store_true",
+        help="print namespace versions, type counts and sizes of all serialized outputs",
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="build only pages under this site path, e.g. rosetta/polyhedral or spec/groups (repeatable)",
+    )
+    parser.add_argument(
+        "--example",
+        action="append",
+        default=[],
+        metavar="ID",
+        help="build only this example page, e.g. groups-free-group (repeatable)",
+    )
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        choices=OUTPUT_FORMATS,
+        default=list(OUTPUT_FORMATS),
+        help="output formats to keep (default: md html)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="load example payloads one example at a time to bound peak memory",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="number of worker processes for parallel build stages",
+    )
+    return parser.parse_args()
+
+
+def render_html_pages(executor, md_paths, submitted, minify=False):
+    # Pages already handed to the workers while streaming are only collected.
+    remaining = [md_path for md_path in md_paths if md_path not in submitted]
+    rendered = dict(zip(remaining, executor.map(partial(render_html_page, minify=minify), remaining, chunksize=8)))
+    results = [submitted[md_path].result() if md_path in submitted else rendered[md_path] for md_path in md_paths]
+    if minify:
+        original_total = sum(original for original, _, _, _ in results)
+        final_total = sum(final for _, final, _, _ in results)
+        ratio = final_total / original_total if original_total else 1.0
+        print(f"Minified {len(results)} HTML pages: {original_total} -> {final_total} bytes ({ratio:.1%})")
+    changed_count = sum(1 for _, _, changed, _ in results if changed)
+    return changed_count, [links for _, _, _, links in results]
+
+
+def write_page(path, text):
+    changed = write_if_changed(path, text)
+    return "Wrote" if changed else "Unchanged"
+
+
+def write_example_page(example, coverage, spec_catalog, profile_catalog):
+    example_page_path = ROOT_INDEX_MD.parent / example.output_relpath_md
+    markdown, payload_files = build_example_markdown(example, coverage, spec_catalog, profile_catalog)
+    action = write_page(example_page_path, markdown)
+    print(f"{action} {example_page_path}")
+    # Payloads too large to embed are fetched by both the Markdown and the
+    # HTML page, so they are written whichever formats are kept.
+    for payload_path, text in payload_files.items():
+        action = write_page(payload_path, text)
+        print(f"{action} {payload_path}")
+    return example_page_path, list(payload_files)
+
+
 def main():
-    if SITE_DIR.exists():
-        shutil.rmtree(SITE_DIR)
+    args = parse_args()
 
-    examples = discover_examples()
-    systems = build_system_index(examples)
+    # A streaming build keeps only example metadata for the cross-page
+    # indexes; each example is loaded again with its payloads, written and
+    # released before the next one, so peak memory does not grow with the
+    # corpus. Partial builds do the same, so only the selected examples'
+    # payloads are parsed.
+    load_selected = args.stream or bool(args.only or args.example)
+    examples = discover_examples(keep_payloads=not load_selected)
+    coverage = build_coverage_matrix(examples)
     spec_pages = discover_spec_pages()
     spec_catalog = build_spec_catalog(spec_pages, examples)
-    profile_catalog = build_profile_catalog(spec_pages, examples)
+    profile_catalog = build_profile_catalog(spec_pages, coverage)
+    shards = plan_rosetta_index_shards(examples)
+
+    try:
+        selection = select_pages(args.only, args.example, examples, spec_catalog, shards)
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from exc
+
+    if args.memory_report:
+        print(catalog_memory_report("Examples (metadata)", examples, skip=frozenset({"parsed_data"})))
+        # Streaming and partial builds discover example metadata only.
+        if not load_selected:
+            print(catalog_memory_report("Examples (with payloads)", examples))
+        print(catalog_memory_report("Spec catalog", spec_catalog))
+        print(catalog_memory_report("Profile catalog", profile_catalog))
+    if args.coverage_report:
+        print(coverage_report(coverage))
+    if args.census_report:
+        print(census_report(examples))
 
+    # Files whose content is unchanged keep their mtime, so the deploy only
+    # uploads pages that actually changed; stale files are pruned at the end.
     SITE_DIR.mkdir(parents=True, exist_ok=True)
+    written = []
+    payload_paths = []
+    index_actions = {}
 
-    ROOT_INDEX_MD.write_text(build_front_page_markdown(), encoding="utf-8")
-    ROSETTA_INDEX_MD.parent.mkdir(parents=True, exist_ok=True)
-    ROSETTA_INDEX_MD.write_text(build_rosetta_index_markdown(examples, systems), encoding="utf-8")
-    SPEC_INDEX_MD.parent.mkdir(parents=True, exist_ok=True)
-    SPEC_INDEX_MD.write_text(build_spec_index_markdown(spec_catalog), encoding="utf-8")
+    if selection.front_page:
+        index_actions[ROOT_INDEX_MD] = write_page(ROOT_INDEX_MD, build_front_page_markdown())
+        written.append(ROOT_INDEX_MD)
+    if selection.rosetta_index:
+        index_actions[ROSETTA_INDEX_MD] = write_page(
+            ROSETTA_INDEX_MD,
+            build_rosetta_index_markdown(coverage, shards),
+        )
+        written.append(ROSETTA_INDEX_MD)
+    for shard in shards:
+        if shard.id in selection.shard_ids:
+            index_actions[shard.path_md] = write_page(
+                shard.path_md,
+                build_rosetta_shard_markdown(shard, examples, coverage, shards),
+            )
+            written.append(shard.path_md)
+    if selection.spec_index:
+        index_actions[SPEC_INDEX_MD] = write_page(SPEC_INDEX_MD, build_spec_index_markdown(spec_catalog))
+        written.append(SPEC_INDEX_MD)
 
-    for spec_id in sorted(spec_catalog.keys()):
+    for spec_id in selection.spec_ids:
         spec_page = spec_catalog[spec_id]
-        spec_page.path_md.parent.mkdir(parents=True, exist_ok=True)
-        spec_page.path_md.write_text(
+        action = write_page(
+            spec_page.path_md,
             build_spec_page_markdown(spec_page, examples, profile_catalog, spec_catalog),
-            encoding="utf-8",
         )
-        print(f"Wrote {spec_page.path_md}")
-
-    for example_id in sorted(examples.keys()):
-        example = examples[example_id]
-        example_page_path = ROOT_INDEX_MD.parent / example.output_relpath_md
-        example_page_path.parent.mkdir(parents=True, exist_ok=True)
-        example_page_path.write_text(
-            build_example_markdown(example, systems, spec_catalog, profile_catalog),
-            encoding="utf-8",
+        written.append(spec_page.path_md)
+        print(f"{action} {spec_page.path_md}")
+
+    render_html = "html" in args.formats
+    page_links = []
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        submitted = {}
+        for example_id in selection.example_ids:
+            if load_selected:
+                example = load_example(examples[example_id])
+            else:
+                example = examples[example_id]
+            example_page_path, example_payload_paths = write_example_page(
+                example, coverage, spec_catalog, profile_catalog
+            )
+            written.append(example_page_path)
+            payload_paths.extend(example_payload_paths)
+            if args.stream and render_html:
+                submitted[example_page_path] = executor.submit(
+                    render_html_page, example_page_path, minify=args.minify
+                )
+
+        for index_path, action in index_actions.items():
+            print(f"{action} {index_path}")
+
+        # Markdown is always produced because the HTML pages are rendered from it.
+        keep = written_paths()
+        keep.update(payload_paths)
+        if render_html:
+            changed_html, page_links = render_html_pages(executor, sorted(written), submitted, minify=args.minify)
+            print(f"Updated {changed_html} of {len(written)} HTML pages")
+        # Pages that are not rendered again keep their existing HTML.
+        keep.update(md_path.with_suffix(".html") for md_path in written)
+    if "md" not in args.formats:
+        for md_path in written:
+            remove_site_file(md_path)
+            keep.discard(md_path)
+
+    if args.bundle:
+        stats = write_corpus_bundle(examples, CORPUS_BUNDLE_PATH)
+        keep.add(CORPUS_BUNDLE_PATH)
+        print(
+            f"Wrote {CORPUS_BUNDLE_PATH}: {stats.entries} outputs, {stats.blobs} distinct payloads, "
+            f"{stats.payload_bytes} -> {stats.bundle_bytes} bytes"
         )
-        print(f"Wrote {example_page_path}")
 
-    print(f"Wrote {ROOT_INDEX_MD}")
-    print(f"Wrote {ROSETTA_INDEX_MD}")
-    print(f"Wrote {SPEC_INDEX_MD}")
+    # Partial builds update the existing site in place and keep other pages.
+    if selection.full:
+        if args.precompress:
+            keep.update(compressed_sibling(path) for path in list(keep))
+        for path in prune_site(SITE_DIR, keep):
+            print(f"Removed {path}")
+
+    broken_links = check_links(page_links, keep)
+    if page_links:
+        for line in link_report(page_links, broken_links, SITE_DIR):
+            print(line)
+
+    if args.precompress:
+        for line in compression_report(precompress_site(SITE_DIR, workers=args.workers)):
+            print(line)
 
-    for md_path in sorted(SITE_DIR.rglob("*.md")):
-        render_html_page(md_path)
+    manifest, changed = write_deploy_manifest(SITE_DIR)
+    print(f"{'Wrote' if changed else 'Unchanged'} {DEPLOY_MANIFEST_PATH} ({len(manifest)} files)")
 
 
 if __name__ == "__main__":
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from html import escape
 from html.parser import HTMLParser
 import re
 from urllib.parse import urlsplit, urlunsplit
 
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
 import marko
 from marko.html_renderer import HTMLRenderer
+from markupsafe import Markup
 
-from content import load_text
-from settings import TEMPLATE_PATH
+from link_check import PageLinks
+from minify import minify_html
+from settings import TEMPLATE_CACHE_DIR, TEMPLATES_DIR
+from site_writer import write_if_changed
 from utils import slugify
 
 
@@ -72,9 +77,10 @@ def rewrite_link_target(target: str) -> str:
 
 
 class RawHtmlLinkRewriter(HTMLParser):
-    def __init__(self):
+    def __init__(self, links: PageLinks | None = None):
         super().__init__(convert_charrefs=False)
         self.parts: list[str] = []
+        self.links = links
 
     def handle_starttag(self, tag, attrs):
         self.parts.append(self._render_tag(tag, attrs, closing=False))
@@ -114,46 +120,86 @@ class RawHtmlLinkRewriter(HTMLParser):
                 continue
             if name in {"href", "src"}:
                 value = rewrite_link_target(value)
+            if self.links is not None:
+                self._collect(name, value)
             rendered_attrs.append(f'{name}="{escape(value, quote=True)}"')
         attrs_suffix = f" {' '.join(rendered_attrs)}" if rendered_attrs else ""
         ending = " /" if closing else ""
         return f"<{tag}{attrs_suffix}{ending}>"
 
+    def _collect(self, name, value):
+        assert self.links is not None
+        if name in {"href", "src"}:
+            self.links.hrefs.append(value)
+        elif name == "id":
+            self.links.anchors.add(value)
+        elif name == "data-tab-hashes":
+            # The tab script selects a tab when the URL fragment names one of
+            # its hashes, so these are valid link targets too.
+            self.links.anchors.update(value.split(","))
 
-def rewrite_html_links(html_text: str) -> str:
-    parser = RawHtmlLinkRewriter()
+
+def rewrite_html_links(html_text: str, links: PageLinks | None = None) -> str:
+    parser = RawHtmlLinkRewriter(links)
     parser.feed(html_text)
     parser.close()
     return "".join(parser.parts)
 
 
-def protect_math_segments(text: str) -> tuple[str, dict[str, str]]:
-    replacements: dict[str, str] = {}
-    patterns = [
-        re.compile(r"\$\$.*?\$\$", flags=re.DOTALL),
-        re.compile(r"\\\[.*?\\\]", flags=re.DOTALL),
-        re.compile(r"\\\(.*?\\\)", flags=re.DOTALL),
-    ]
+class SegmentProtector:
+    def __init__(self, patterns: list[str], token_prefix: str, escape_segments: bool = True):
+        self.patterns = list(patterns)
+        self.token_prefix = token_prefix
+        self.escape_segments = escape_segments
+        self._compile()
+
+    def _compile(self) -> None:
+        self._segment_re = re.compile(
+            "|".join(f"(?:{pattern})" for pattern in self.patterns),
+            flags=re.DOTALL,
+        )
+        self._token_re = re.compile(f"@@{re.escape(self.token_prefix)}\\d+@@")
+
+    def register(self, pattern: str) -> None:
+        self.patterns.append(pattern)
+        self._compile()
+
+    def protect(self, text: str) -> tuple[str, dict[str, str]]:
+        replacements: dict[str, str] = {}
 
-    def replace(match):
-        token = f"@@MATH{len(replacements)}@@"
-        replacements[token] = escape(match.group(0), quote=False)
-        return token
+        def replace(match):
+            token = f"@@{self.token_prefix}{len(replacements)}@@"
+            segment = match.group(0)
+            replacements[token] = escape(segment, quote=False) if self.escape_segments else segment
+            return token
 
-    protected = text
-    for pattern in patterns:
-        protected = pattern.sub(replace, protected)
-    return protected, replacements
+        return self._segment_re.sub(replace, text), replacements
+
+    def restore(self, text: str, replacements: dict[str, str]) -> str:
+        if not replacements:
+            return text
+        return self._token_re.sub(lambda match: replacements.get(match.group(0), match.group(0)), text)
+
+
+PROTECTED_SEGMENTS = SegmentProtector(
+    [
+        r"\$\$.*?\$\$",
+        r"\\\[.*?\\\]",
+        r"\\\(.*?\\\)",
+    ],
+    token_prefix="MATH",
+)
+
+
+def protect_math_segments(text: str) -> tuple[str, dict[str, str]]:
+    return PROTECTED_SEGMENTS.protect(text)
 
 
 def restore_math_segments(text: str, replacements: dict[str, str]) -> str:
-    restored = text
-    for token, original in replacements.items():
-        restored = restored.replace(token, original)
-    return restored
+    return PROTECTED_SEGMENTS.restore(text, replacements)
 
 
-def markdown_to_html(md_text: str) -> str:
+def markdown_to_html(md_text: str, links: PageLinks | None = None) -> str:
     text = md_text
     nav_html = ""
     nav_match = re.match(r'(<div class="page-nav">.*?</div>\n+)', text, flags=re.DOTALL)
@@ -164,7 +210,7 @@ def markdown_to_html(md_text: str) -> str:
     renderer = marko.Markdown(renderer=HeadingIdRenderer, extensions=["gfm"])
     html = nav_html + renderer.convert(text)
     html = restore_math_segments(html, math_replacements)
-    return rewrite_html_links(html)
+    return rewrite_html_links(html, links)
 
 
 def extract_title(md_text: str, fallback: str) -> str:
@@ -177,23 +223,44 @@ def extract_title(md_text: str, fallback: str) -> str:
     return fallback
 
 
-def render_html_page(md_path):
-    md_text = md_path.read_text(encoding="utf-8")
-    content_html = markdown_to_html(md_text)
-    title = extract_title(md_text, md_path.stem)
-    full_html = load_text(TEMPLATE_PATH)
-    full_html = full_html.replace("{{ title }}", title)
-    full_html = full_html.replace("{{ page_class }}", page_class_for(md_path))
-    full_html = full_html.replace("{{ content }}", content_html)
-    html_path = md_path.with_suffix(".html")
-    html_path.write_text(full_html, encoding="utf-8")
-    print(f"Wrote {html_path}")
+@lru_cache(maxsize=1)
+def template_environment() -> Environment:
+    # One environment per process: each template is compiled once, and the
+    # compiled bytecode is shared between processes and builds on disk.
+    TEMPLATE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        bytecode_cache=FileSystemBytecodeCache(str(TEMPLATE_CACHE_DIR)),
+        autoescape=select_autoescape(["html"]),
+        keep_trailing_newline=True,
+    )
 
 
-def page_class_for(md_path):
+def render_html_page(md_path, minify=False):
+    md_text = md_path.read_text(encoding="utf-8")
+    html_path = md_path.with_suffix(".html")
+    links = PageLinks(html_path)
+    content_html = markdown_to_html(md_text, links)
+    title = extract_title(md_text, md_path.stem)
+    template = template_environment().get_template(page_template_for(md_path))
+    full_html = template.render(title=title, content=Markup(content_html))
+    original_size = len(full_html.encode("utf-8"))
+    if minify:
+        full_html = minify_html(full_html)
+    final_size = len(full_html.encode("utf-8"))
+    changed = write_if_changed(html_path, full_html)
+    action = "Wrote" if changed else "Unchanged"
+    if minify:
+        print(f"{action} {html_path} ({original_size} -> {final_size} bytes)")
+    else:
+        print(f"{action} {html_path}")
+    return original_size, final_size, changed, links
+
+
+def page_template_for(md_path):
     parts = md_path.parts
     if "spec" in parts:
-        return "section-spec"
+        return "spec.html"
     if "rosetta" in parts:
-        return "section-rosetta"
-    return "section-neutral"
+        return "rosetta.html"
+    return "neutral.html"
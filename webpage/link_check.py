@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import os
+from pathlib import Path
+import posixpath
+import re
+from urllib.parse import unquote
+
+SCHEME_RE = re.compile(r"[A-Za-z][A-Za-z0-9+.-]*:")
+
+
+@dataclass(slots=True)
+class PageLinks:
+    path: Path
+    anchors: set[str] = field(default_factory=set)
+    hrefs: list[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class BrokenLink:
+    page: Path
+    href: str
+    reason: str
+
+
+def resolve_target(page_dir: str, path: str) -> str | None:
+    # None for external links (a scheme, //host or a site-absolute path).
+    if SCHEME_RE.match(path) or path.startswith("/"):
+        return None
+    path = path.partition("?")[0]
+    return posixpath.normpath(posixpath.join(page_dir, unquote(path)))
+
+
+def check_links(pages: list[PageLinks], site_files: set[Path]) -> list[BrokenLink]:
+    # One pass over the collected hrefs against the anchors collected while
+    # rendering. Pages that were not rendered in this build (partial builds,
+    # payload files) can only be checked for existence. Most link targets
+    # repeat across a directory, so each is resolved once per directory.
+    anchors_by_page = {page.path.as_posix(): page.anchors for page in pages}
+    known_files = {path.as_posix() for path in site_files}
+    resolved: dict[tuple[str, str], str | None] = {}
+    broken = []
+    for page in pages:
+        page_path = page.path.as_posix()
+        page_dir = posixpath.dirname(page_path)
+        for href in page.hrefs:
+            path, _, fragment = href.partition("#")
+            if path:
+                key = (page_dir, path)
+                if key in resolved:
+                    target = resolved[key]
+                else:
+                    target = resolved[key] = resolve_target(page_dir, path)
+                if target is None:
+                    continue
+            else:
+                target = page_path
+            target_anchors = anchors_by_page.get(target)
+            if target_anchors is None:
+                if target not in known_files and not os.path.isfile(target):
+                    broken.append(BrokenLink(page.path, href, "missing page"))
+                continue
+            if fragment and fragment not in target_anchors and unquote(fragment) not in target_anchors:
+                broken.append(BrokenLink(page.path, href, "missing anchor"))
+    return broken
+
+
+def link_report(pages: list[PageLinks], broken: list[BrokenLink], site_dir: Path) -> list[str]:
+    lines = [
+        f"Error, broken link in {link.page.relative_to(site_dir)}: {link.href} ({link.reason})"
+        for link in broken
+    ]
+    total = sum(len(page.hrefs) for page in pages)
+    lines.append(f"Checked {total} links in {len(pages)} HTML pages, {len(broken)} broken")
+    return lines
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from pathlib import PurePath
+import sys
+
+
+def slot_names(value: object) -> list[str]:
+    names: list[str] = []
+    for cls in type(value).__mro__:
+        slots = cls.__dict__.get("__slots__", ())
+        names.extend([slots] if isinstance(slots, str) else slots)
+    return names
+
+
+def deep_sizeof(value: object, seen: set[int] | None = None, skip: frozenset[str] = frozenset()) -> int:
+    # Counts every reachable object once, so interned strings and shared
+    # namespace records are only charged to the first owner.
+    if seen is None:
+        seen = set()
+    total = 0
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        total += sys.getsizeof(node)
+        if isinstance(node, (str, bytes, int, float, bool, PurePath)) or node is None:
+            continue
+        if isinstance(node, dict):
+            stack.extend(node.keys())
+            stack.extend(node.values())
+        elif isinstance(node, (list, tuple, set, frozenset)):
+            stack.extend(node)
+        elif hasattr(node, "__dict__"):
+            stack.append(node.__dict__)
+        else:
+            stack.extend(
+                getattr(node, name)
+                for name in slot_names(node)
+                if name not in skip and hasattr(node, name)
+            )
+    return total
+
+
+def catalog_memory_report(name: str, catalog: dict, skip: frozenset[str] = frozenset()) -> str:
+    total = deep_sizeof(catalog, skip=skip)
+    per_entry = total / len(catalog) if catalog else 0.0
+    return f"{name}: {len(catalog)} entries, {total} bytes ({per_entry:.0f} bytes per entry)"
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import re
+
+PRESERVED_ELEMENT_RE = re.compile(
+    r"<(pre|code|script|textarea)\b.*?</\1\s*>",
+    flags=re.DOTALL | re.IGNORECASE,
+)
+COMMENT_RE = re.compile(r"<!--(?!\[if).*?-->", flags=re.DOTALL)
+TAG_RE = re.compile(r"<[^<>]+>")
+QUOTED_RE = re.compile(r"(\"[^\"]*\"|'[^']*')")
+WHITESPACE_RE = re.compile(r"\s+")
+ATTRIBUTE_EQUALS_RE = re.compile(r"\s*=\s*")
+TAG_END_SPACE_RE = re.compile(r"\s+(/?>)$")
+BLOCK_TAGS = (
+    "html|head|body|main|title|meta|link|style|div|p|ul|ol|li|dl|dt|dd|"
+    "table|thead|tbody|tfoot|tr|th|td|h[1-6]|hr|br|blockquote|section|nav|header|footer"
+)
+BLOCK_TAG_SPACE_RE = re.compile(
+    rf"\s*(</?(?:{BLOCK_TAGS})\b[^>]*>|<!doctype[^>]*>)\s*",
+    flags=re.IGNORECASE,
+)
+
+
+def minify_tag(tag: str) -> str:
+    parts = QUOTED_RE.split(tag)
+    for index in range(0, len(parts), 2):
+        parts[index] = ATTRIBUTE_EQUALS_RE.sub("=", WHITESPACE_RE.sub(" ", parts[index]))
+    return TAG_END_SPACE_RE.sub(r"\1", "".join(parts))
+
+
+def minify_fragment(fragment: str) -> str:
+    fragment = COMMENT_RE.sub("", fragment)
+    pieces = []
+    last_end = 0
+    for match in TAG_RE.finditer(fragment):
+        pieces.append(WHITESPACE_RE.sub(" ", fragment[last_end:match.start()]))
+        pieces.append(minify_tag(match.group(0)))
+        last_end = match.end()
+    pieces.append(WHITESPACE_RE.sub(" ", fragment[last_end:]))
+    return BLOCK_TAG_SPACE_RE.sub(r"\1", "".join(pieces))
+
+
+def minify_html(html_text: str) -> str:
+    parts = []
+    last_end = 0
+    for match in PRESERVED_ELEMENT_RE.finditer(html_text):
+        parts.append(minify_fragment(html_text[last_end:match.start()]))
+        parts.append(match.group(0))
+        last_end = match.end()
+    parts.append(minify_fragment(html_text[last_end:]))
+    return "".join(parts).strip() + "\n"
@@ -3,8 +3,20 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from pathlib import Path
 
+from content import MarkdownDocument
+from mrdi_census import PayloadCensus
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
+class Namespace:
+    # Interned and shared by every output with the same `_ns` entry, hence
+    # immutable.
+    name: str
+    url: str
+    version: str
+
+
+@dataclass(slots=True)
 class ExampleOutput:
     id: str
     path: Path
@@ -12,18 +24,20 @@ class ExampleOutput:
     generate_files: list[Path]
     parsed_data: dict | list | None
     root_type: str | None
-    namespaces: list[dict[str, str]]
+    namespaces: tuple[Namespace, ...]
     profile_id: str | None
+    alias_of: str | None = None
+    census: PayloadCensus | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ExampleSystem:
     path: Path
     shared_generate_files: list[Path]
     outputs: dict[str, ExampleOutput]
 
 
-@dataclass
+@dataclass(slots=True)
 class ExamplePage:
     id: str
     slug: str
@@ -34,14 +48,18 @@ class ExamplePage:
     subcategory: str | None
     order: int | None
     profiles: list[str]
-    body: str
+    document: MarkdownDocument
     systems: dict[str, ExampleSystem]
     unavailable_profiles: list[str] = field(default_factory=list)
     unavailable_note: str | None = None
     spec_ids: list[str] = field(default_factory=list)
 
+    @property
+    def body(self) -> str:
+        return self.document.body
 
-@dataclass
+
+@dataclass(slots=True)
 class SpecPage:
     id: str
     title: str
@@ -49,14 +67,29 @@ class SpecPage:
     kind: str
     order: int | None
     profiles: list[str]
-    body: str
+    document: MarkdownDocument
     section: str
     source_path: Path
     path_md: Path
     example_ids: list[str] = field(default_factory=list)
 
+    @property
+    def body(self) -> str:
+        return self.document.body.rstrip()
+
+
+@dataclass(slots=True)
+class RosettaIndexShard:
+    id: str
+    path_md: Path
+    title: str
+    category: str
+    subcategory: str | None
+    example_ids: list[str]
+    child_ids: list[str] = field(default_factory=list)
+
 
-@dataclass
+@dataclass(slots=True)
 class Profile:
     id: str
     title: str
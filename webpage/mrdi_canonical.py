@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from collections import deque
+import json
+
+from mrdi_compare import UUID_RE, MerkleHasher, strip_namespace_versions
+
+# The canonical form of a payload: keys sorted, and every UUID replaced by a
+# sequential one in order of first occurrence. The root is walked first with
+# keys in sorted order (skipping `_refs`), then `_refs` entries breadth-first
+# as they are referenced. Entries nothing refers to follow in order of their
+# MerkleHasher digest, which does not depend on UUID spelling, so two
+# payloads that compare equivalent canonicalize to the same bytes.
+
+
+def canonical_uuid(number: int) -> str:
+    return f"00000000-0000-4000-8000-{number:012x}"
+
+
+class Canonicalizer:
+    def __init__(self, payload: object):
+        refs = payload.get("_refs") if isinstance(payload, dict) else None
+        self.payload = payload
+        self.refs: dict[str, object] = refs if isinstance(refs, dict) else {}
+        self.numbering: dict[str, str] = {}
+        self._pending: deque[str] = deque()
+
+    def number(self, uuid: str) -> str:
+        canonical = self.numbering.get(uuid)
+        if canonical is None:
+            canonical = self.numbering[uuid] = canonical_uuid(len(self.numbering) + 1)
+            if uuid in self.refs:
+                self._pending.append(uuid)
+        return canonical
+
+    def rewrite(self, node: object) -> object:
+        if isinstance(node, str):
+            if len(node) == 36 and UUID_RE.match(node) is not None:
+                return self.number(node)
+            return node
+        if isinstance(node, list):
+            return [self.rewrite(item) for item in node]
+        if isinstance(node, dict):
+            result = {}
+            for key in sorted(node):
+                value = node[key]
+                if value is self.refs and key == "_refs":
+                    continue
+                result[self.rewrite(key)] = self.rewrite(value)
+            return result
+        return node
+
+    def canonicalize(self) -> object:
+        root = self.rewrite(self.payload)
+        if not isinstance(root, dict) or not isinstance(self.payload, dict) or "_refs" not in self.payload:
+            return root
+        refs: dict[str, object] = {}
+        self._drain(refs)
+        unreached = [uuid for uuid in self.refs if uuid not in self.numbering]
+        if unreached:
+            hasher = MerkleHasher(self.payload)
+            for uuid in sorted(unreached, key=lambda uuid: (hasher.ref_digest(uuid), uuid)):
+                if uuid not in self.numbering:
+                    self.number(uuid)
+                    self._drain(refs)
+        root["_refs"] = dict(sorted(refs.items()))
+        return root
+
+    def _drain(self, refs: dict[str, object]) -> None:
+        while self._pending:
+            uuid = self._pending.popleft()
+            refs[self.numbering[uuid]] = self.rewrite(self.refs[uuid])
+
+
+def without_namespace_versions(node: object) -> object:
+    if isinstance(node, list):
+        return [without_namespace_versions(item) for item in node]
+    if isinstance(node, dict):
+        return {
+            key: strip_namespace_versions(value) if key == "_ns" else without_namespace_versions(value)
+            for key, value in node.items()
+        }
+    return node
+
+
+def canonicalize_payload(payload: object, *, strip_versions: bool = False) -> object:
+    if strip_versions:
+        payload = without_namespace_versions(payload)
+    return Canonicalizer(payload).canonicalize()
+
+
+def encode_canonical(payload: object) -> bytes:
+    # Same compact layout as the serialized files in the tree.
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+import hashlib
+import json
+import sys
+
+from mrdi_compare import UUID_RE
+from mrdi_refs import type_name_of
+from settings import BUILD_CACHE_DIR
+
+CENSUS_CACHE_DIR = BUILD_CACHE_DIR / "census"
+# Bump when census_payload changes, to invalidate cached results.
+CENSUS_VERSION = 2
+
+NamespaceEntry = tuple[str, str, str]
+
+_DATA = 0
+_TYPE = 1
+
+
+@dataclass(frozen=True, slots=True)
+class PayloadCensus:
+    root_type: str | None
+    root_namespaces: tuple[NamespaceEntry, ...]
+    # Every `_type` name at any depth, including type parameters such as the
+    # element types of `Dict` or `MatElem`, with their number of occurrences.
+    type_names: tuple[tuple[str, int], ...]
+    # Every `_ns` entry at any depth, e.g. the polymake namespace of objects
+    # nested in an Oscar payload, in order of first occurrence.
+    namespaces: tuple[NamespaceEntry, ...]
+    ref_count: int
+    node_count: int
+    max_depth: int
+
+    @property
+    def has_refs(self) -> bool:
+        return self.ref_count > 0
+
+
+def namespace_entries(ns: object) -> list[NamespaceEntry]:
+    if not isinstance(ns, dict):
+        return []
+    entries = []
+    for name, value in ns.items():
+        url = ""
+        version = ""
+        if isinstance(value, list):
+            if len(value) >= 1:
+                url = str(value[0])
+            if len(value) >= 2:
+                version = str(value[1])
+        elif isinstance(value, str):
+            version = value
+        entries.append((str(name), url, version))
+    return entries
+
+
+def census_payload(payload: object) -> PayloadCensus:
+    # One iterative pass over the whole tree. Values below a `_type` key are
+    # walked as type descriptions: strings and `name` entries there are type
+    # names, unless they hold a complete serialized object of their own.
+    type_names: Counter[str] = Counter()
+    namespaces: dict[NamespaceEntry, None] = {}
+    node_count = 0
+    max_depth = 0
+    stack: list[tuple[object, int, int]] = [(payload, 1, _DATA)]
+    while stack:
+        node, depth, kind = stack.pop()
+        node_count += 1
+        if depth > max_depth:
+            max_depth = depth
+        child_depth = depth + 1
+        if isinstance(node, dict):
+            if kind == _TYPE and "_type" not in node:
+                name = node.get("name")
+                if isinstance(name, str):
+                    type_names[name] += 1
+                    for key, value in node.items():
+                        if key == "params":
+                            stack.append((value, child_depth, _TYPE))
+                        elif key == "name":
+                            node_count += 1
+                            if child_depth > max_depth:
+                                max_depth = child_depth
+                        else:
+                            stack.append((value, child_depth, _DATA))
+                    continue
+                stack.extend((value, child_depth, _TYPE) for value in node.values())
+                continue
+            for key, value in node.items():
+                if key == "_type":
+                    stack.append((value, child_depth, _TYPE))
+                elif key == "_ns":
+                    namespaces.update(dict.fromkeys(namespace_entries(value)))
+                    stack.append((value, child_depth, _DATA))
+                else:
+                    stack.append((value, child_depth, _DATA))
+        elif isinstance(node, list):
+            stack.extend((item, child_depth, kind) for item in node)
+        elif kind == _TYPE and isinstance(node, str) and UUID_RE.match(node) is None:
+            type_names[node] += 1
+
+    root = payload if isinstance(payload, dict) else {}
+    refs = root.get("_refs")
+    return PayloadCensus(
+        root_type=type_name_of(root.get("_type")),
+        root_namespaces=tuple(namespace_entries(root.get("_ns"))),
+        type_names=tuple(sorted(type_names.items())),
+        namespaces=tuple(namespaces),
+        ref_count=len(refs) if isinstance(refs, dict) else 0,
+        node_count=node_count,
+        max_depth=max_depth,
+    )
+
+
+def census_to_record(census: PayloadCensus) -> dict:
+    return {
+        "root_type": census.root_type,
+        "root_namespaces": [list(entry) for entry in census.root_namespaces],
+        "type_names": [list(item) for item in census.type_names],
+        "namespaces": [list(entry) for entry in census.namespaces],
+        "ref_count": census.ref_count,
+        "node_count": census.node_count,
+        "max_depth": census.max_depth,
+    }
+
+
+def _intern_entry(entry: list[str]) -> NamespaceEntry:
+    name, url, version = entry
+    return (sys.intern(name), sys.intern(url), sys.intern(version))
+
+
+def census_from_record(record: dict) -> PayloadCensus:
+    root_type = record["root_type"]
+    return PayloadCensus(
+        root_type=sys.intern(root_type) if root_type is not None else None,
+        root_namespaces=tuple(_intern_entry(entry) for entry in record["root_namespaces"]),
+        type_names=tuple((sys.intern(name), count) for name, count in record["type_names"]),
+        namespaces=tuple(_intern_entry(entry) for entry in record["namespaces"]),
+        ref_count=record["ref_count"],
+        node_count=record["node_count"],
+        max_depth=record["max_depth"],
+    )
+
+
+class CensusCache:
+    # Census results by SHA-256 of the payload file, kept in
+    # .build-cache/census/ across builds and shared by all outputs in a run.
+
+    def __init__(self, cache_path=CENSUS_CACHE_DIR / f"v{CENSUS_VERSION}.json"):
+        self.cache_path = cache_path
+        self._records: dict[str, dict] | None = None
+        self._census: dict[str, PayloadCensus] = {}
+        self._dirty = False
+
+    def _load(self) -> dict[str, dict]:
+        if self._records is None:
+            records = {}
+            if self.cache_path.exists():
+                try:
+                    records = json.loads(self.cache_path.read_text(encoding="utf-8"))
+                except json.JSONDecodeError:
+                    records = {}
+            self._records = records if isinstance(records, dict) else {}
+        return self._records
+
+    def cached(self, raw: bytes) -> PayloadCensus | None:
+        # Lets callers that do not need the payload skip parsing it.
+        return self._cached(hashlib.sha256(raw).hexdigest())
+
+    def _cached(self, digest: str) -> PayloadCensus | None:
+        census = self._census.get(digest)
+        if census is not None:
+            return census
+        record = self._load().get(digest)
+        if record is None:
+            return None
+        try:
+            census = census_from_record(record)
+        except (KeyError, TypeError, ValueError):
+            return None
+        self._census[digest] = census
+        return census
+
+    def census_for(self, raw: bytes, payload: object) -> PayloadCensus:
+        digest = hashlib.sha256(raw).hexdigest()
+        census = self._cached(digest)
+        if census is None:
+            records = self._load()
+            census = census_payload(payload)
+            records[digest] = census_to_record(census)
+            self._dirty = True
+            self._census[digest] = census
+        return census
+
+    def save(self) -> None:
+        if not self._dirty or self._records is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self.cache_path.write_text(json.dumps(self._records, sort_keys=True) + "\n", encoding="utf-8")
+        self._dirty = False
+
+
+_CENSUS_CACHE: CensusCache | None = None
+
+
+def census_cache() -> CensusCache:
+    global _CENSUS_CACHE
+    if _CENSUS_CACHE is None:
+        _CENSUS_CACHE = CensusCache()
+    return _CENSUS_CACHE
+
+
+def census_report(examples) -> str:
+    # Totals over every discovered output, from the census alone.
+    type_names: Counter[str] = Counter()
+    namespace_versions: Counter[tuple[str, str]] = Counter()
+    outputs = 0
+    nodes = 0
+    deepest = (0, "")
+    for example_id, example in examples.items():
+        for system_name, system in example.systems.items():
+            for output in system.outputs.values():
+                census = output.census
+                if census is None:
+                    continue
+                outputs += 1
+                nodes += census.node_count
+                type_names.update(dict(census.type_names))
+                namespace_versions.update((name, version) for name, _, version in census.namespaces)
+                if census.max_depth > deepest[0]:
+                    deepest = (census.max_depth, f"{example_id}/{system_name}/{output.id}")
+    lines = [
+        f"Payload census: {outputs} outputs, {nodes} nodes, {len(type_names)} distinct types, "
+        f"deepest {deepest[0]} levels ({deepest[1] or 'none'})",
+        "Namespace versions (outputs using each):",
+    ]
+    for (name, version), count in sorted(namespace_versions.items()):
+        lines.append(f"  {name} {version or '(no version)'}: {count}")
+    lines.append("Most common types (occurrences):")
+    for name, count in type_names.most_common(20):
+        lines.append(f"  {name}: {count}")
+    return "\n".join(lines)
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import hashlib
 import re
 from collections.abc import Sequence
 from dataclasses import dataclass, field
 
+from mrdi_paths import NAMESPACE_VERSION_PATTERN, NO_RULES, IgnoreRules, Position, compile_ignore_rules
+
 UUID_RE = re.compile(
     r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$",
     re.IGNORECASE,
@@ -14,31 +17,50 @@ class CompareError(Exception):
     pass
 
 
+@dataclass
+class CompareStats:
+    # Work counters for benchmarks; shared by a state and all of its clones.
+    candidate_attempts: int = 0
+    clones: int = 0
+
+
 @dataclass
 class CompareState:
     uuid_map: dict[str, str] = field(default_factory=dict)
     reverse_uuid_map: dict[str, str] = field(default_factory=dict)
     ignore_namespace_versions: bool = False
+    ignore_paths: tuple[str, ...] = ()
+    stats: CompareStats | None = field(default=None, repr=False)
+    rules: IgnoreRules | None = field(init=False, default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        patterns = tuple(self.ignore_paths)
+        if self.ignore_namespace_versions:
+            patterns += (NAMESPACE_VERSION_PATTERN,)
+        self.rules = compile_ignore_rules(patterns)
 
     def clone(self) -> "CompareState":
+        if self.stats is not None:
+            self.stats.clones += 1
         return CompareState(
             uuid_map=dict(self.uuid_map),
             reverse_uuid_map=dict(self.reverse_uuid_map),
             ignore_namespace_versions=self.ignore_namespace_versions,
+            ignore_paths=self.ignore_paths,
+            stats=self.stats,
         )
 
+    def child_position(self, position: Position, segment: str | int) -> Position:
+        if not position or self.rules is None:
+            return NO_RULES
+        return self.rules.advance(position, segment)
 
-def is_uuid_string(value: object) -> bool:
-    return isinstance(value, str) and UUID_RE.match(value) is not None
+    def is_ignored(self, position: Position) -> bool:
+        return bool(position) and self.rules is not None and self.rules.ignores(position)
 
 
-def is_namespace_version_path(path: str) -> bool:
-    if "._ns." not in path:
-        return False
-    _, namespace_tail = path.rsplit("._ns.", 1)
-    if "[" not in namespace_tail:
-        return False
-    return namespace_tail.endswith("[1]")
+def is_uuid_string(value: object) -> bool:
+    return isinstance(value, str) and UUID_RE.match(value) is not None
 
 
 def bind_uuid(left: str, right: str, path: str, state: CompareState) -> None:
@@ -63,9 +85,6 @@ def bind_uuid(left: str, right: str, path: str, state: CompareState) -> None:
 
 
 def compare_strings(left: str, right: str, path: str, state: CompareState) -> None:
-    if state.ignore_namespace_versions and is_namespace_version_path(path):
-        return
-
     left_is_uuid = is_uuid_string(left)
     right_is_uuid = is_uuid_string(right)
     if left_is_uuid or right_is_uuid:
@@ -85,6 +104,7 @@ def compare_refs_dict(
     right: dict[str, object],
     path: str,
     state: CompareState,
+    position: Position = NO_RULES,
 ) -> None:
     if len(left) != len(right):
         raise CompareError(
@@ -107,6 +127,7 @@ def compare_refs_dict(
                 right[mapped_key],
                 f"{path}.{left_key}",
                 state,
+                state.child_position(position, left_key),
             )
             unmatched_right.discard(mapped_key)
             continue
@@ -115,6 +136,8 @@ def compare_refs_dict(
         success = False
         last_error: CompareError | None = None
         for candidate in candidates:
+            if state.stats is not None:
+                state.stats.candidate_attempts += 1
             candidate_state = state.clone()
             try:
                 compare_strings(left_key, candidate, f"{path}.<key>", candidate_state)
@@ -123,6 +146,7 @@ def compare_refs_dict(
                     right[candidate],
                     f"{path}.{left_key}",
                     candidate_state,
+                    candidate_state.child_position(position, left_key),
                 )
             except CompareError as exc:
                 last_error = exc
@@ -140,43 +164,56 @@ def compare_refs_dict(
             raise CompareError(f"{path}: could not match UUID key {left_key!r}")
 
 
+def visible_keys(mapping: dict[str, object], position: Position, state: CompareState) -> dict[str, Position]:
+    # Keys whose subtree is ignored are dropped before the key sets are
+    # compared, so they may also be missing on one side.
+    keys = {}
+    for key in mapping:
+        child_position = state.child_position(position, key)
+        if not state.is_ignored(child_position):
+            keys[key] = child_position
+    return keys
+
+
 def compare_dicts(
     left: dict[str, object],
     right: dict[str, object],
     path: str,
     state: CompareState,
+    position: Position = NO_RULES,
 ) -> None:
-    if "_refs" in left or "_refs" in right:
-        left_keys = set(left.keys())
-        right_keys = set(right.keys())
-        if left_keys != right_keys:
-            raise CompareError(
-                f"{path}: expected keys {sorted(left_keys)!r}, got {sorted(right_keys)!r}"
-            )
-        for key in sorted(left.keys()):
-            child_path = f"{path}.{key}" if path else key
-            if key == "_refs":
-                left_refs = left[key]
-                right_refs = right[key]
-                if not isinstance(left_refs, dict) or not isinstance(right_refs, dict):
-                    raise CompareError(f"{child_path}: expected dict-valued _refs")
-                compare_refs_dict(left_refs, right_refs, child_path, state)
-            else:
-                compare_json(left[key], right[key], child_path, state)
-        return
-
-    left_keys = set(left.keys())
-    right_keys = set(right.keys())
-    if left_keys != right_keys:
+    left_keys = visible_keys(left, position, state)
+    right_keys = visible_keys(right, position, state)
+    if left_keys.keys() != right_keys.keys():
         raise CompareError(
             f"{path}: expected keys {sorted(left_keys)!r}, got {sorted(right_keys)!r}"
         )
 
-    for key in sorted(left.keys()):
-        compare_json(left[key], right[key], f"{path}.{key}" if path else key, state)
+    has_refs = "_refs" in left or "_refs" in right
+    for key in sorted(left_keys):
+        child_path = f"{path}.{key}" if path else key
+        if has_refs and key == "_refs":
+            left_refs = left[key]
+            right_refs = right[key]
+            if not isinstance(left_refs, dict) or not isinstance(right_refs, dict):
+                raise CompareError(f"{child_path}: expected dict-valued _refs")
+            compare_refs_dict(left_refs, right_refs, child_path, state, left_keys[key])
+        else:
+            compare_json(left[key], right[key], child_path, state, left_keys[key])
+
 
+def compare_json(
+    left: object,
+    right: object,
+    path: str,
+    state: CompareState,
+    position: Position | None = None,
+) -> None:
+    if position is None:
+        position = state.rules.root if state.rules is not None else NO_RULES
+    if state.is_ignored(position):
+        return
 
-def compare_json(left: object, right: object, path: str, state: CompareState) -> None:
     if isinstance(left, str) and isinstance(right, str):
         compare_strings(left, right, path, state)
         return
@@ -191,7 +228,7 @@ def compare_json(left: object, right: object, path: str, state: CompareState) ->
             raise CompareError(
                 f"{path}: expected type {type(left).__name__}, got {type(right).__name__}"
             )
-        compare_dicts(left, right, path, state)
+        compare_dicts(left, right, path, state, position)
         return
 
     if isinstance(left, list):
@@ -205,7 +242,7 @@ def compare_json(left: object, right: object, path: str, state: CompareState) ->
                 f"{path}: expected list length {len(left)}, got {len(right_list)}"
             )
         for index, (left_item, right_item) in enumerate(zip(left, right_list)):
-            compare_json(left_item, right_item, f"{path}[{index}]", state)
+            compare_json(left_item, right_item, f"{path}[{index}]", state, state.child_position(position, index))
         return
 
     if left != right:
@@ -217,14 +254,256 @@ def equivalent_json(
     right: object,
     *,
     ignore_namespace_versions: bool = False,
+    ignore_paths: Sequence[str] = (),
 ) -> bool:
     try:
         compare_json(
             left,
             right,
             "$",
-            CompareState(ignore_namespace_versions=ignore_namespace_versions),
+            CompareState(
+                ignore_namespace_versions=ignore_namespace_versions,
+                ignore_paths=tuple(ignore_paths),
+            ),
         )
     except CompareError:
         return False
     return True
+
+
+@dataclass(frozen=True)
+class DiffEntry:
+    kind: str
+    path: str
+    left: object = None
+    right: object = None
+
+
+class MerkleHasher:
+    # Subtree digests that do not depend on UUID spelling: a UUID hashes as
+    # the digest of the `_refs` entry it names, and `_refs` hashes as the
+    # multiset of its entry digests.
+
+    def __init__(self, payload: object, *, ignore_namespace_versions: bool = False):
+        refs = payload.get("_refs") if isinstance(payload, dict) else None
+        self.refs: dict[str, object] = refs if isinstance(refs, dict) else {}
+        self.ignore_namespace_versions = ignore_namespace_versions
+        self._node_digests: dict[int, bytes] = {}
+        self._ref_digests: dict[str, bytes] = {}
+        self._string_digests: dict[str, bytes] = {}
+        self._in_progress: set[str] = set()
+        self._namespace_views: dict[int, tuple[object, object]] = {}
+
+    def namespace_view(self, namespaces: object) -> object:
+        # Digests are memoized by object id, so the version-stripped copy is
+        # kept alive alongside its source for the lifetime of the hasher.
+        if not self.ignore_namespace_versions:
+            return namespaces
+        view = self._namespace_views.get(id(namespaces))
+        if view is None:
+            view = (namespaces, strip_namespace_versions(namespaces))
+            self._namespace_views[id(namespaces)] = view
+        return view[1]
+
+    def ref_digest(self, uuid: str) -> bytes:
+        digest = self._ref_digests.get(uuid)
+        if digest is not None:
+            return digest
+        if uuid in self._in_progress:
+            return b"<cycle>"
+        self._in_progress.add(uuid)
+        digest = self.digest(self.refs[uuid])
+        self._in_progress.discard(uuid)
+        self._ref_digests[uuid] = digest
+        return digest
+
+    def digest(self, node: object) -> bytes:
+        if isinstance(node, str):
+            digest = self._string_digests.get(node)
+            if digest is None:
+                if len(node) == 36 and UUID_RE.match(node) is not None:
+                    return _hash(b"u" + (self.ref_digest(node) if node in self.refs else b""))
+                digest = _hash(b"s" + node.encode("utf-8"))
+                self._string_digests[node] = digest
+            return digest
+
+        cached = self._node_digests.get(id(node))
+        if cached is not None:
+            return cached
+        # Child digests have a fixed size, so plain concatenation is unambiguous.
+        digest_of = self.digest
+        if isinstance(node, list):
+            digest = _hash(b"l" + b"".join([digest_of(item) for item in node]))
+        elif isinstance(node, dict):
+            if node is self.refs:
+                digest = _hash(b"r" + b"".join(sorted([digest_of(entry) for entry in node.values()])))
+            else:
+                digest = _hash(
+                    b"d"
+                    + b"".join(
+                        [
+                            digest_of(str(key)) + digest_of(self.namespace_view(node[key]) if key == "_ns" else node[key])
+                            for key in sorted(node)
+                        ]
+                    )
+                )
+        else:
+            return _hash(b"v" + f"{type(node).__name__}:{node!r}".encode("utf-8"))
+        self._node_digests[id(node)] = digest
+        return digest
+
+
+def _hash(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def strip_namespace_versions(namespaces: object) -> object:
+    if not isinstance(namespaces, dict):
+        return namespaces
+    return {
+        name: entry[:1] if isinstance(entry, list) else entry
+        for name, entry in namespaces.items()
+    }
+
+
+def structural_diff(
+    left: object,
+    right: object,
+    *,
+    ignore_namespace_versions: bool = False,
+) -> list[DiffEntry]:
+    left_hasher = MerkleHasher(left, ignore_namespace_versions=ignore_namespace_versions)
+    right_hasher = MerkleHasher(right, ignore_namespace_versions=ignore_namespace_versions)
+    entries: list[DiffEntry] = []
+    ref_pairs: dict[str, str] = {}
+
+    # Subtrees with equal digests are skipped without being visited, so the
+    # walk touches only the changed spine plus one hashing pass per side.
+    stack: list[tuple[object, object, str]] = [(left, right, "$")]
+    while stack:
+        left_node, right_node, path = stack.pop()
+        if left_hasher.digest(left_node) == right_hasher.digest(right_node):
+            continue
+
+        if isinstance(left_node, dict) and isinstance(right_node, dict):
+            children: list[tuple[object, object, str]] = []
+            for key in sorted(set(left_node) | set(right_node), key=str):
+                child_path = f"{path}.{key}"
+                if key not in right_node:
+                    entries.append(DiffEntry("removed", child_path, left=left_node[key]))
+                elif key not in left_node:
+                    entries.append(DiffEntry("added", child_path, right=right_node[key]))
+                elif key == "_refs" and left_node[key] is left_hasher.refs and right_node[key] is right_hasher.refs:
+                    children.extend(pair_refs(left_hasher, right_hasher, child_path, entries, ref_pairs))
+                elif key == "_ns":
+                    children.append(
+                        (
+                            left_hasher.namespace_view(left_node[key]),
+                            right_hasher.namespace_view(right_node[key]),
+                            child_path,
+                        )
+                    )
+                else:
+                    children.append((left_node[key], right_node[key], child_path))
+            stack.extend(reversed(children))
+        elif isinstance(left_node, list) and isinstance(right_node, list):
+            stack.extend(reversed(pair_list_items(left_node, right_node, left_hasher, right_hasher, path, entries)))
+        elif type(left_node) is not type(right_node):
+            entries.append(DiffEntry("type", path, left_node, right_node))
+        elif is_uuid_string(left_node) and is_uuid_string(right_node):
+            # A reference to a paired entry differs only because that entry
+            # changed, which is reported under `_refs`.
+            if ref_pairs.get(str(left_node)) != right_node:
+                entries.append(DiffEntry("reference", path, left_node, right_node))
+        else:
+            entries.append(DiffEntry("changed", path, left_node, right_node))
+    return entries
+
+
+def pair_refs(
+    left_hasher: MerkleHasher,
+    right_hasher: MerkleHasher,
+    path: str,
+    entries: list[DiffEntry],
+    ref_pairs: dict[str, str],
+) -> list[tuple[object, object, str]]:
+    # Identical entries match by digest; of the rest, entries with the same
+    # UUID or else the same `_type` name are compared, leftovers are reported.
+    unmatched_right: dict[bytes, list[str]] = {}
+    for uuid in right_hasher.refs:
+        unmatched_right.setdefault(right_hasher.ref_digest(uuid), []).append(uuid)
+
+    left_rest = []
+    for uuid in left_hasher.refs:
+        candidates = unmatched_right.get(left_hasher.ref_digest(uuid))
+        if candidates:
+            candidates.pop()
+        else:
+            left_rest.append(uuid)
+    right_rest = [uuid for uuids in unmatched_right.values() for uuid in uuids]
+
+    same_uuid = set(left_rest) & set(right_rest)
+    pairs = [(uuid, uuid) for uuid in sorted(same_uuid)]
+    right_by_type: dict[object, list[str]] = {}
+    for uuid in sorted(right_rest):
+        if uuid not in same_uuid:
+            right_by_type.setdefault(_ref_type_name(right_hasher.refs[uuid]), []).append(uuid)
+    for uuid in sorted(left_rest):
+        if uuid in same_uuid:
+            continue
+        candidates = right_by_type.get(_ref_type_name(left_hasher.refs[uuid]))
+        if candidates:
+            pairs.append((uuid, candidates.pop(0)))
+        else:
+            entries.append(DiffEntry("removed", f"{path}.{uuid}", left=left_hasher.refs[uuid]))
+    for uuids in right_by_type.values():
+        for uuid in uuids:
+            entries.append(DiffEntry("added", f"{path}.{uuid}", right=right_hasher.refs[uuid]))
+
+    ref_pairs.update(pairs)
+    return [
+        (left_hasher.refs[left_uuid], right_hasher.refs[right_uuid], f"{path}.{left_uuid}")
+        for left_uuid, right_uuid in pairs
+    ]
+
+
+def _ref_type_name(entry: object) -> object:
+    type_value = entry.get("_type") if isinstance(entry, dict) else None
+    if isinstance(type_value, dict):
+        return type_value.get("name")
+    return type_value
+
+
+def pair_list_items(
+    left: list[object],
+    right: list[object],
+    left_hasher: MerkleHasher,
+    right_hasher: MerkleHasher,
+    path: str,
+    entries: list[DiffEntry],
+) -> list[tuple[object, object, str]]:
+    # Trim the common prefix and suffix by digest, then compare the middle
+    # position by position; this stays linear where a full alignment would not.
+    start = 0
+    limit = min(len(left), len(right))
+    while start < limit and left_hasher.digest(left[start]) == right_hasher.digest(right[start]):
+        start += 1
+    left_end, right_end = len(left), len(right)
+    while (
+        left_end > start
+        and right_end > start
+        and left_hasher.digest(left[left_end - 1]) == right_hasher.digest(right[right_end - 1])
+    ):
+        left_end -= 1
+        right_end -= 1
+
+    pairs = []
+    common = min(left_end - start, right_end - start)
+    for offset in range(common):
+        index = start + offset
+        pairs.append((left[index], right[index], f"{path}[{index}]"))
+    for index in range(start + common, left_end):
+        entries.append(DiffEntry("removed", f"{path}[{index}]", left=left[index]))
+    for index in range(start + common, right_end):
+        entries.append(DiffEntry("added", f"{path}[{index}]", right=right[index]))
+    return pairs
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from fractions import Fraction
+import re
+
+import numpy as np
+
+from mrdi_refs import RefGraph, ResolvedRef, type_name_of
+
+RING_ALIASES = {
+    "QQField": "QQ",
+    "QQ": "QQ",
+    "Rational": "QQ",
+    "ZZRing": "ZZ",
+    "ZZ": "ZZ",
+    "Integer": "ZZ",
+    "Int": "ZZ",
+    "Base.Int": "ZZ",
+    "Int64": "ZZ",
+    "Float64": "float",
+    "Float": "float",
+    "double": "float",
+}
+
+MATRIX_TYPE_NAMES = {"MatElem", "MatSpace", "Matrix", "Vector", "SparseMatrix", "SparseVector"}
+MATRIX_PROPERTIES = ("FACETS", "RAYS", "VERTICES", "INEQUALITIES", "EQUATIONS", "POINTS", "LINEAR_OBJECTIVE")
+POLYMAKE_ELEMENT_RE = re.compile(r"<\s*(\w+)")
+
+
+class DecodeError(Exception):
+    pass
+
+
+def ring_name(value: object) -> str | None:
+    # Accepts a ring descriptor such as {"_type": "QQField"}, a resolved ring
+    # reference, or a polymake type name such as "Matrix<Rational, NonSymmetric>".
+    if isinstance(value, ResolvedRef):
+        name = value.type_name
+        if name in {"MatSpace", "PolyRing", "MPolyRing"}:
+            base_ring = value.graph.resolve_value(_mapping_get(value.data, "base_ring"))
+            return ring_name(value.params) or ring_name(base_ring)
+        return RING_ALIASES.get(name or "", name)
+    if isinstance(value, dict):
+        if "_type" in value:
+            return ring_name(type_name_of(value["_type"]))
+        if "params" in value:
+            return ring_name(value["params"])
+        return None
+    if isinstance(value, str):
+        match = POLYMAKE_ELEMENT_RE.search(value)
+        if match is not None:
+            return RING_ALIASES.get(match.group(1), match.group(1))
+        return RING_ALIASES.get(value, value)
+    return None
+
+
+def _mapping_get(value: object, key: str) -> object:
+    return value.get(key) if isinstance(value, dict) else None
+
+
+def matrix_entries(data: object) -> tuple[list[object], tuple[int, ...]]:
+    if not isinstance(data, list):
+        raise DecodeError(f"Error, expected a list of matrix rows, got {type(data).__name__}")
+
+    # Polymake writes sparse matrices as rows of {"column": value} followed by
+    # a trailing {"cols": n}; dense and sparse rows may be mixed.
+    ncols: int | None = None
+    rows = data
+    if rows and isinstance(rows[-1], dict) and set(rows[-1].keys()) == {"cols"}:
+        try:
+            ncols = int(rows[-1]["cols"])
+        except (TypeError, ValueError) as exc:
+            raise DecodeError(f"Error, invalid sparse matrix column count {rows[-1]['cols']!r}") from exc
+        rows = rows[:-1]
+
+    if not rows:
+        return [], (0, ncols or 0)
+
+    if not any(isinstance(row, (list, dict)) and not is_scalar_entry(row) for row in rows):
+        return list(rows), (len(rows),)
+
+    for row in rows:
+        if isinstance(row, dict) and not is_sparse_row(row):
+            raise DecodeError(f"Error, expected a sparse matrix row with column keys, got keys {sorted(row)[:5]}")
+
+    if ncols is None:
+        ncols = max(
+            (len(row) if isinstance(row, list) else max((int(key) + 1 for key in row), default=0))
+            for row in rows
+        )
+
+    flat: list[object] = []
+    for row in rows:
+        if isinstance(row, dict):
+            dense: list[object] = [0] * ncols
+            for key, value in row.items():
+                column = int(key)
+                if column >= ncols:
+                    raise DecodeError(f"Error, sparse matrix column {column} is out of range for {ncols} columns")
+                dense[column] = value
+            flat.extend(dense)
+        elif isinstance(row, list) and len(row) == ncols:
+            flat.extend(row)
+        else:
+            raise DecodeError(f"Error, matrix row has {len(row)} entries, expected {ncols}")
+    return flat, (len(rows), ncols)
+
+
+def is_sparse_row(row: dict) -> bool:
+    return all(isinstance(key, str) and key.isdigit() for key in row)
+
+
+def is_scalar_entry(value: object) -> bool:
+    # Number field elements are serialized as lists of [exponent, coefficient]
+    # pairs, which must not be mistaken for matrix rows.
+    return (
+        isinstance(value, list)
+        and bool(value)
+        and all(isinstance(term, list) and len(term) == 2 and isinstance(term[0], str) for term in value)
+    )
+
+
+def parse_fraction(value: object) -> object:
+    if isinstance(value, str):
+        fraction = Fraction(value.replace("//", "/"))
+        return fraction.numerator if fraction.denominator == 1 else fraction
+    return value
+
+
+_parse_fractions = np.frompyfunc(parse_fraction, 1, 1)
+_parse_ints = np.frompyfunc(int, 1, 1)
+
+
+def object_array(flat: list[object], shape: tuple[int, ...]) -> np.ndarray:
+    array = np.empty(len(flat), dtype=object)
+    array[:] = flat
+    return array.reshape(shape)
+
+
+def decode_entries(flat: list[object], shape: tuple[int, ...], ring: str | None = None, *, exact: bool = True) -> np.ndarray:
+    if not flat:
+        return np.zeros(shape, dtype=np.float64 if ring == "float" else np.int64)
+
+    if any(isinstance(value, (list, dict)) for value in flat):
+        return object_array(flat, shape)
+
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in flat):
+        try:
+            return np.array(flat).reshape(shape)
+        except OverflowError:
+            return object_array(flat, shape)
+
+    strings = np.array([str(value) for value in flat], dtype=np.str_)
+    if ring == "float":
+        try:
+            return strings.astype(np.float64).reshape(shape)
+        except ValueError:
+            # Entries such as "1//2" are converted by the inexact fraction path.
+            exact = False
+
+    if bool((np.char.find(strings, "/") >= 0).any()):
+        if exact:
+            try:
+                return np.asarray(_parse_fractions(strings), dtype=object).reshape(shape)
+            except (ValueError, ZeroDivisionError) as exc:
+                raise DecodeError(f"Error, matrix entries are not fractions: {exc}") from exc
+        parts = np.char.partition(np.char.replace(strings, "//", "/"), "/")
+        numerators = parts[:, 0]
+        denominators = np.where(parts[:, 2] == "", "1", parts[:, 2])
+        try:
+            return (numerators.astype(np.float64) / denominators.astype(np.float64)).reshape(shape)
+        except ValueError as exc:
+            raise DecodeError(f"Error, matrix entries are not fractions: {exc}") from exc
+
+    try:
+        return strings.astype(np.int64).reshape(shape)
+    except (OverflowError, ValueError):
+        pass
+    try:
+        return np.asarray(_parse_ints(strings), dtype=object).reshape(shape)
+    except ValueError:
+        pass
+    try:
+        return strings.astype(np.float64).reshape(shape)
+    except ValueError as exc:
+        raise DecodeError(f"Error, matrix entries are not numbers: {exc}") from exc
+
+
+def decode_matrix(data: object, ring: str | None = None, *, exact: bool = True) -> np.ndarray:
+    flat, shape = matrix_entries(data)
+    return decode_entries(flat, shape, ring, exact=exact)
+
+
+def descriptor_ring(graph: RefGraph, descriptor: object) -> str | None:
+    if not isinstance(descriptor, dict):
+        return ring_name(descriptor) if isinstance(descriptor, str) else None
+    params = graph.resolve_value(descriptor.get("params"))
+    if type_name_of(descriptor) in MATRIX_TYPE_NAMES or "name" in descriptor:
+        return ring_name(params)
+    return None
+
+
+def decode_payload(payload: object, *, exact: bool = True) -> np.ndarray:
+    if not isinstance(payload, dict) or "data" not in payload:
+        raise DecodeError("Error, expected an MRDI payload with a data entry")
+    graph = RefGraph(payload)
+    type_value = payload.get("_type")
+    ring = descriptor_ring(graph, type_value) if isinstance(type_value, dict) else ring_name(type_value)
+    return decode_matrix(payload["data"], ring, exact=exact)
+
+
+def property_descriptors(type_value: object) -> dict[str, object]:
+    descriptors: dict[str, object] = {}
+    stack = [type_value]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key in MATRIX_PROPERTIES and key not in descriptors:
+                    descriptors[key] = value
+                stack.append(value)
+        elif isinstance(node, list):
+            stack.extend(node)
+    return descriptors
+
+
+def iter_matrix_properties(
+    payload: object,
+    names: tuple[str, ...] = MATRIX_PROPERTIES,
+    *,
+    exact: bool = True,
+) -> Iterator[tuple[str, str, np.ndarray]]:
+    if not isinstance(payload, dict):
+        return
+    graph = RefGraph(payload)
+    type_value = payload.get("_type")
+    descriptors = property_descriptors(type_value)
+    default_ring = ring_name(graph.root_params()) or ring_name(type_value)
+
+    stack: list[tuple[object, str, str | None]] = [(payload.get("data"), "$.data", default_ring)]
+    while stack:
+        node, path, ring = stack.pop()
+        if isinstance(node, dict):
+            # Nested polymake objects name their own element type.
+            node_ring = ring_name(node["_type"]) if isinstance(node.get("_type"), str) else ring
+            for key, value in node.items():
+                child_path = f"{path}.{key}"
+                if key in names and isinstance(value, list):
+                    property_ring = descriptor_ring(graph, descriptors.get(key)) or node_ring
+                    try:
+                        yield child_path, key, decode_matrix(value, property_ring, exact=exact)
+                    except DecodeError:
+                        pass
+                elif key not in {"_type", "_ns", "_attrs", "_info"}:
+                    stack.append((value, child_path, node_ring))
+        elif isinstance(node, list):
+            for index in range(len(node) - 1, -1, -1):
+                stack.append((node[index], f"{path}[{index}]", ring))
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from functools import lru_cache
+import re
+
+# Path patterns use the same notation as comparison error paths, e.g.
+# `$._info.credits` or `$.data.rows[0]`. `*` matches any single key, `[*]` any
+# list index and `**` any number of segments, so `**._attrs` matches `_attrs`
+# at every depth. A leading `$.` is optional.
+NAMESPACE_VERSION_PATTERN = "**._ns.*[1]"
+POLYMAKE_VOLATILE_PATTERNS = ("**._info.credits", "**._info.description", "**._attrs")
+
+SEGMENT_RE = re.compile(r"\.?(\*\*|\*|[^.\[\]]+)|\[(\d+|\*)\]")
+
+ANY_KEY = "*"
+ANY_INDEX = "[*]"
+GLOBSTAR = "**"
+
+Position = frozenset[int]
+NO_RULES: Position = frozenset()
+
+
+class PathPatternError(ValueError):
+    pass
+
+
+def parse_path_pattern(pattern: str) -> list[str | int]:
+    text = pattern.strip()
+    if text.startswith("$"):
+        text = text[1:]
+    segments: list[str | int] = []
+    offset = 0
+    while offset < len(text):
+        match = SEGMENT_RE.match(text, offset)
+        if match is None or match.end() == offset:
+            raise PathPatternError(f"Error, invalid path pattern {pattern!r} at offset {offset + 1}")
+        key, index = match.groups()
+        if index is None:
+            segments.append(key)
+        elif index == "*":
+            segments.append(ANY_INDEX)
+        else:
+            segments.append(int(index))
+        offset = match.end()
+    if not segments:
+        raise PathPatternError(f"Error, empty path pattern {pattern!r}")
+    return segments
+
+
+class IgnoreRules:
+    # The patterns share one trie. A position in the payload corresponds to
+    # the set of trie nodes reachable along its path, so comparison walks the
+    # trie alongside the payload instead of matching every path string.
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = tuple(patterns)
+        self._literal: list[dict[str | int, int]] = []
+        self._any_key: list[int | None] = []
+        self._any_index: list[int | None] = []
+        self._globstar: list[int | None] = []
+        self._loops: list[bool] = []
+        self._terminal: list[bool] = []
+        root = self._new_node()
+        for pattern in self.patterns:
+            node = root
+            for segment in parse_path_pattern(pattern):
+                node = self._child(node, segment)
+            self._terminal[node] = True
+        self.root = self._closure({root})
+
+    def _new_node(self, loops: bool = False) -> int:
+        self._literal.append({})
+        self._any_key.append(None)
+        self._any_index.append(None)
+        self._globstar.append(None)
+        self._loops.append(loops)
+        self._terminal.append(False)
+        return len(self._terminal) - 1
+
+    def _child(self, node: int, segment: str | int) -> int:
+        if segment == GLOBSTAR:
+            child = self._globstar[node]
+            if child is None:
+                child = self._globstar[node] = self._new_node(loops=True)
+            return child
+        if segment == ANY_KEY:
+            child = self._any_key[node]
+            if child is None:
+                child = self._any_key[node] = self._new_node()
+            return child
+        if segment == ANY_INDEX:
+            child = self._any_index[node]
+            if child is None:
+                child = self._any_index[node] = self._new_node()
+            return child
+        literal = self._literal[node]
+        if segment not in literal:
+            literal[segment] = self._new_node()
+        return literal[segment]
+
+    def _closure(self, nodes: set[int]) -> Position:
+        # `**` also matches zero segments.
+        pending = list(nodes)
+        while pending:
+            globstar = self._globstar[pending.pop()]
+            if globstar is not None and globstar not in nodes:
+                nodes.add(globstar)
+                pending.append(globstar)
+        return frozenset(nodes)
+
+    def advance(self, position: Position, segment: str | int) -> Position:
+        if not position:
+            return NO_RULES
+        return self._advance(position, segment)
+
+    @lru_cache(maxsize=4096)
+    def _advance(self, position: Position, segment: str | int) -> Position:
+        reached: set[int] = set()
+        is_index = isinstance(segment, int)
+        for node in position:
+            if self._loops[node]:
+                reached.add(node)
+            literal = self._literal[node].get(segment)
+            if literal is not None:
+                reached.add(literal)
+            wildcard = self._any_index[node] if is_index else self._any_key[node]
+            if wildcard is not None:
+                reached.add(wildcard)
+        return self._closure(reached) if reached else NO_RULES
+
+    def ignores(self, position: Position) -> bool:
+        return any(self._terminal[node] for node in position)
+
+
+@lru_cache(maxsize=64)
+def compile_ignore_rules(patterns: tuple[str, ...]) -> IgnoreRules | None:
+    return IgnoreRules(patterns) if patterns else None
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from fractions import Fraction
+import importlib
+import json
+from pathlib import Path
+import re
+
+from mrdi_refs import RefGraph, ResolvedRef, type_name_of
+
+POLYNOMIAL_TYPES = {"PolyRingElem", "MPolyRingElem"}
+POLYNOMIAL_RING_TYPES = {"PolyRing", "MPolyRing"}
+FINITE_FIELD_TYPES = {"FqField", "FiniteField", "Nemo.fpField", "Nemo.FpField"}
+
+# Oscar 1.4 moved the coefficient ring of polynomial rings from
+# `data.base_ring` into `_type.params`.
+PARAMS_BASE_RING_SINCE = (1, 4)
+
+
+class PolynomialLoadError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class CoefficientRing:
+    name: str
+    characteristic: int = 0
+
+    def parse(self, value: object) -> int | Fraction:
+        if not isinstance(value, str):
+            raise PolynomialLoadError(f"Error, unsupported {self.name} coefficient {value!r}")
+        if self.name == "QQ":
+            coefficient = Fraction(value.replace("//", "/"))
+            return coefficient.numerator if coefficient.denominator == 1 else coefficient
+        if self.name == "ZZ":
+            return int(value)
+        return int(value) % self.characteristic
+
+    def __str__(self) -> str:
+        if self.characteristic:
+            return f"GF({self.characteristic})"
+        return self.name
+
+
+@dataclass(frozen=True)
+class PolynomialRingSpec:
+    base_ring: CoefficientRing
+    symbols: tuple[str, ...]
+    univariate: bool
+
+
+class SparsePolynomial:
+    def __init__(self, ring: PolynomialRingSpec, terms: dict[tuple[int, ...], int | Fraction]):
+        self.ring = ring
+        self.terms = {exponents: coeff for exponents, coeff in terms.items() if coeff != 0}
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SparsePolynomial):
+            return NotImplemented
+        return self.ring == other.ring and self.terms == other.terms
+
+    def __hash__(self) -> int:
+        return hash((self.ring, frozenset(self.terms.items())))
+
+    def __repr__(self) -> str:
+        return f"SparsePolynomial({self})"
+
+    def __str__(self) -> str:
+        if not self.terms:
+            return "0"
+        parts = []
+        for exponents in sorted(self.terms, reverse=True):
+            coeff = self.terms[exponents]
+            monomial = "*".join(
+                symbol if exponent == 1 else f"{symbol}^{exponent}"
+                for symbol, exponent in zip(self.ring.symbols, exponents)
+                if exponent
+            )
+            if not monomial:
+                parts.append(str(coeff))
+            elif coeff == 1:
+                parts.append(monomial)
+            elif coeff == -1:
+                parts.append(f"-{monomial}")
+            else:
+                parts.append(f"{coeff}*{monomial}")
+        return " + ".join(parts).replace("+ -", "- ")
+
+    def degree(self) -> int:
+        return max((sum(exponents) for exponents in self.terms), default=-1)
+
+    def coefficient(self, exponents: tuple[int, ...]) -> int | Fraction:
+        return self.terms.get(exponents, 0)
+
+
+class PythonBackend:
+    name = "python"
+
+    def build(self, ring: PolynomialRingSpec, terms: dict[tuple[int, ...], int | Fraction]) -> object:
+        return SparsePolynomial(ring, terms)
+
+
+class SageBackend:
+    name = "sage"
+
+    def __init__(self):
+        self.sage = importlib.import_module("sage.all")
+        self._rings: dict[PolynomialRingSpec, object] = {}
+
+    def sage_ring(self, ring: PolynomialRingSpec):
+        sage_ring = self._rings.get(ring)
+        if sage_ring is None:
+            if ring.base_ring.name == "QQ":
+                base = self.sage.QQ
+            elif ring.base_ring.name == "ZZ":
+                base = self.sage.ZZ
+            else:
+                base = self.sage.GF(ring.base_ring.characteristic)
+            sage_ring = self.sage.PolynomialRing(base, list(ring.symbols))
+            self._rings[ring] = sage_ring
+        return sage_ring
+
+    def build(self, ring: PolynomialRingSpec, terms: dict[tuple[int, ...], int | Fraction]) -> object:
+        sage_ring = self.sage_ring(ring)
+        if ring.univariate:
+            return sage_ring({exponents[0]: coeff for exponents, coeff in terms.items()})
+        return sage_ring(terms)
+
+
+def sage_available() -> bool:
+    try:
+        importlib.import_module("sage.all")
+    except ImportError:
+        return False
+    return True
+
+
+_BACKENDS: dict[str, PythonBackend | SageBackend] = {}
+
+
+def get_backend(backend: str | None = None) -> PythonBackend | SageBackend:
+    if backend is None:
+        backend = "sage" if sage_available() else "python"
+    instance = _BACKENDS.get(backend)
+    if instance is None:
+        if backend == "python":
+            instance = PythonBackend()
+        elif backend == "sage":
+            instance = SageBackend()
+        else:
+            raise ValueError(f"Error, unknown polynomial backend {backend!r}")
+        _BACKENDS[backend] = instance
+    return instance
+
+
+def oscar_version(payload: dict) -> tuple[int, ...] | None:
+    ns = payload.get("_ns")
+    entry = ns.get("Oscar") if isinstance(ns, dict) else None
+    if not isinstance(entry, list) or len(entry) < 2:
+        return None
+    match = re.match(r"(\d+)\.(\d+)", str(entry[1]))
+    if match is None:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+
+def coefficient_ring(value: object) -> CoefficientRing:
+    if isinstance(value, ResolvedRef):
+        name = value.type_name
+        if name in FINITE_FIELD_TYPES and isinstance(value.data, str):
+            return CoefficientRing("GF", int(value.data))
+        raise PolynomialLoadError(f"Error, unsupported coefficient ring {name!r}")
+    name = type_name_of(value.get("_type")) if isinstance(value, dict) else None
+    if name == "QQField":
+        return CoefficientRing("QQ")
+    if name == "ZZRing":
+        return CoefficientRing("ZZ")
+    raise PolynomialLoadError(f"Error, unsupported coefficient ring {name!r}")
+
+
+def polynomial_ring_spec(ring: ResolvedRef, version: tuple[int, ...] | None) -> PolynomialRingSpec:
+    if ring.type_name not in POLYNOMIAL_RING_TYPES:
+        raise PolynomialLoadError(f"Error, expected a polynomial ring, got {ring.type_name!r}")
+    data = ring.data if isinstance(ring.data, dict) else {}
+    base_ring_sources = [ring.params, ring.graph.resolve_value(data.get("base_ring"))]
+    if version is not None and version < PARAMS_BASE_RING_SINCE:
+        base_ring_sources.reverse()
+    base_ring = next((source for source in base_ring_sources if source is not None), None)
+    if base_ring is None:
+        raise PolynomialLoadError(f"Error, polynomial ring {ring.uuid!r} has no coefficient ring")
+    symbols = data.get("symbols")
+    if not isinstance(symbols, list):
+        raise PolynomialLoadError(f"Error, polynomial ring {ring.uuid!r} has no symbols")
+    return PolynomialRingSpec(
+        base_ring=coefficient_ring(base_ring),
+        symbols=tuple(str(symbol) for symbol in symbols),
+        univariate=ring.type_name == "PolyRing",
+    )
+
+
+def polynomial_terms(data: object, ring: PolynomialRingSpec) -> dict[tuple[int, ...], int | Fraction]:
+    if not isinstance(data, list):
+        raise PolynomialLoadError("Error, expected a list of polynomial terms")
+    parse = ring.base_ring.parse
+    if ring.univariate:
+        return {(int(exponent),): parse(coeff) for exponent, coeff in data}
+    return {tuple(map(int, exponents)): parse(coeff) for exponents, coeff in data}
+
+
+def load_polynomial(payload: object, backend: str | None = None) -> object:
+    if not isinstance(payload, dict):
+        raise PolynomialLoadError("Error, expected an MRDI payload")
+    graph = RefGraph(payload)
+    if graph.root_type_name() not in POLYNOMIAL_TYPES:
+        raise PolynomialLoadError(f"Error, expected a polynomial, got {graph.root_type_name()!r}")
+    version = oscar_version(payload)
+    if version is None or version[0] != 1:
+        raise PolynomialLoadError(f"Error, unsupported Oscar serialization version {version!r}")
+
+    parent = graph.root_params()
+    if not isinstance(parent, ResolvedRef):
+        raise PolynomialLoadError("Error, polynomial parent ring must be a _refs entry")
+    ring = polynomial_ring_spec(parent, version)
+    return get_backend(backend).build(ring, polynomial_terms(payload.get("data"), ring))
+
+
+def load_polynomial_file(path: Path, backend: str | None = None) -> object:
+    return load_polynomial(json.loads(Path(path).read_text(encoding="utf-8")), backend=backend)
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from mrdi_compare import is_uuid_string
+
+
+class RefError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class RefIssue:
+    kind: str
+    uuid: str
+    path: str
+
+    def __str__(self) -> str:
+        if self.kind == "dangling":
+            return f"{self.path}: reference {self.uuid!r} is missing from _refs"
+        return f"{self.path}: reference {self.uuid!r} is part of a reference cycle"
+
+
+@dataclass(frozen=True)
+class TypedNode:
+    path: str
+    type_name: str
+    params: object
+    data: object
+
+
+def type_name_of(type_value: object) -> str | None:
+    if isinstance(type_value, str):
+        return type_value
+    if isinstance(type_value, dict):
+        name = type_value.get("name")
+        if isinstance(name, str):
+            return name
+    return None
+
+
+class ResolvedRef:
+    def __init__(self, graph: RefGraph, uuid: str, entry: dict):
+        self.graph = graph
+        self.uuid = uuid
+        self.entry = entry
+        self._params: object = None
+        self._params_resolved = False
+
+    def __repr__(self) -> str:
+        return f"ResolvedRef({self.uuid!r}, {self.type_name!r})"
+
+    @property
+    def type_name(self) -> str | None:
+        return type_name_of(self.entry.get("_type"))
+
+    @property
+    def raw_params(self) -> object:
+        type_value = self.entry.get("_type")
+        return type_value.get("params") if isinstance(type_value, dict) else None
+
+    @property
+    def params(self) -> object:
+        if not self._params_resolved:
+            self._params = self.graph.resolve_value(self.raw_params)
+            self._params_resolved = True
+        return self._params
+
+    @property
+    def data(self) -> object:
+        return self.entry.get("data")
+
+    def parents(self) -> Iterator[ResolvedRef]:
+        # Follows the chain of reference-valued parameters, e.g. an element's
+        # ring, that ring's base ring, and so on.
+        seen = {self.uuid}
+        current: ResolvedRef = self
+        while True:
+            parent = next(iter(current.referenced()), None)
+            if parent is None or parent.uuid in seen:
+                return
+            seen.add(parent.uuid)
+            yield parent
+            current = parent
+
+    def referenced(self) -> list[ResolvedRef]:
+        return [self.graph.resolve(uuid) for uuid in self.graph.edges().get(self.uuid, [])]
+
+
+class RefGraph:
+    def __init__(self, payload: object):
+        self.payload = payload
+        refs = payload.get("_refs") if isinstance(payload, dict) else None
+        self.refs: dict[str, dict] = refs if isinstance(refs, dict) else {}
+        self._resolved: dict[str, ResolvedRef] = {}
+        self._edges: dict[str, list[str]] | None = None
+        self._root_edges: list[str] = []
+        self._dangling: list[RefIssue] = []
+
+    def is_ref(self, value: object) -> bool:
+        return isinstance(value, str) and value in self.refs
+
+    def resolve(self, uuid: str) -> ResolvedRef:
+        resolved = self._resolved.get(uuid)
+        if resolved is not None:
+            return resolved
+        entry = self.refs.get(uuid)
+        if not isinstance(entry, dict):
+            raise RefError(f"Error, reference {uuid!r} is missing from _refs")
+        resolved = ResolvedRef(self, uuid, entry)
+        self._resolved[uuid] = resolved
+        return resolved
+
+    def resolve_value(self, value: object) -> object:
+        if isinstance(value, str):
+            return self.resolve(value) if self.is_ref(value) else value
+        if isinstance(value, list):
+            return [self.resolve_value(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self.resolve_value(item) for key, item in value.items()}
+        return value
+
+    def root_type_name(self) -> str | None:
+        if not isinstance(self.payload, dict):
+            return None
+        return type_name_of(self.payload.get("_type"))
+
+    def root_params(self) -> object:
+        if not isinstance(self.payload, dict):
+            return None
+        type_value = self.payload.get("_type")
+        if not isinstance(type_value, dict):
+            return None
+        return self.resolve_value(type_value.get("params"))
+
+    def edges(self) -> dict[str, list[str]]:
+        if self._edges is None:
+            self._index()
+        assert self._edges is not None
+        return self._edges
+
+    def _index(self) -> None:
+        # One pass over the payload: every UUID-shaped string outside the
+        # _refs keys is an edge from the enclosing ref entry (or the root).
+        edges: dict[str, dict[str, None]] = {uuid: {} for uuid in self.refs}
+        root_edges: dict[str, None] = {}
+        dangling: list[RefIssue] = []
+
+        # The top-level `id` of the payload or of a ref entry declares that
+        # object's own identity and is not a reference.
+        stack: list[tuple[object, str, str | None]] = []
+        if isinstance(self.payload, dict):
+            for key, value in self.payload.items():
+                if key not in {"_refs", "id"}:
+                    stack.append((value, f"$.{key}", None))
+        for uuid, entry in self.refs.items():
+            if not isinstance(entry, dict):
+                continue
+            for key, value in entry.items():
+                if key != "id":
+                    stack.append((value, f"$._refs.{uuid}.{key}", uuid))
+
+        while stack:
+            node, path, owner = stack.pop()
+            if isinstance(node, str):
+                if not is_uuid_string(node):
+                    continue
+                if node not in self.refs:
+                    dangling.append(RefIssue("dangling", node, path))
+                    continue
+                targets = root_edges if owner is None else edges[owner]
+                targets[node] = None
+            elif isinstance(node, dict):
+                for key, value in node.items():
+                    stack.append((value, f"{path}.{key}", owner))
+            elif isinstance(node, list):
+                for index, value in enumerate(node):
+                    stack.append((value, f"{path}[{index}]", owner))
+
+        self._edges = {uuid: list(targets) for uuid, targets in edges.items()}
+        self._root_edges = list(root_edges)
+        self._dangling = sorted(dangling, key=lambda issue: issue.path)
+
+    def root_references(self) -> list[ResolvedRef]:
+        self.edges()
+        return [self.resolve(uuid) for uuid in self._root_edges]
+
+    def issues(self) -> list[RefIssue]:
+        edges = self.edges()
+        issues = list(self._dangling)
+
+        white, grey, black = 0, 1, 2
+        color = {uuid: white for uuid in edges}
+        for start in edges:
+            if color[start] != white:
+                continue
+            color[start] = grey
+            stack = [(start, iter(edges[start]))]
+            while stack:
+                uuid, children = stack[-1]
+                child = next(children, None)
+                if child is None:
+                    color[uuid] = black
+                    stack.pop()
+                elif color[child] == grey:
+                    issues.append(RefIssue("cycle", child, f"$._refs.{uuid}"))
+                elif color[child] == white:
+                    color[child] = grey
+                    stack.append((child, iter(edges[child])))
+        return issues
+
+    def typed_nodes(self, type_name: str | None = None) -> Iterator[TypedNode]:
+        # Walks the payload once, yielding every node that carries a `_type`,
+        # with reference-valued parameters resolved.
+        stack: list[tuple[object, str]] = [(self.payload, "$")]
+        while stack:
+            node, path = stack.pop()
+            if isinstance(node, dict):
+                node_type = type_name_of(node.get("_type"))
+                if node_type is not None and (type_name is None or node_type == type_name):
+                    type_value = node["_type"]
+                    params = type_value.get("params") if isinstance(type_value, dict) else None
+                    yield TypedNode(path, node_type, self.resolve_value(params), node.get("data"))
+                for key in reversed(list(node.keys())):
+                    stack.append((node[key], f"{path}.{key}"))
+            elif isinstance(node, list):
+                for index in range(len(node) - 1, -1, -1):
+                    stack.append((node[index], f"{path}[{index}]"))
@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import hashlib
+import json
+from pathlib import Path
+import re
+
+from mrdi_refs import RefGraph
+from settings import BUILD_CACHE_DIR, SCHEMA_PATH
+
+Checker = Callable[[object, str], str | None]
+
+# Stand-ins for schemas that are referenced by URL but not shipped with the
+# repository. Polymake objects carry their own `_ns`, which is exactly what the
+# local "plain data" branch excludes.
+EXTERNAL_SCHEMAS: dict[str, dict] = {
+    "https://polymake.org/schemas/data.json": {"type": "object", "required": ["_ns"]},
+}
+
+SCHEMA_CACHE_DIR = BUILD_CACHE_DIR / "schema"
+# Bump when the checks in validate_payload change, to invalidate cached results.
+VALIDATOR_VERSION = 3
+
+JSON_TYPES: dict[str, tuple[type, ...]] = {
+    "object": (dict,),
+    "array": (list,),
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "null": (type(None),),
+}
+
+
+# Keywords compile_node turns into checks, and keywords that do not constrain
+# the value. Anything else is rejected, so a schema change that needs a new
+# check cannot silently accept invalid payloads.
+COMPILED_KEYWORDS = frozenset({"$ref", "type", "required", "properties", "patternProperties", "items", "oneOf", "not"})
+ANNOTATION_KEYWORDS = frozenset(
+    {"$schema", "$id", "$defs", "definitions", "$comment", "title", "description", "examples", "default"}
+)
+
+
+class SchemaError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class ValidationResult:
+    path: Path
+    digest: str
+    errors: tuple[str, ...]
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+
+class SchemaCompiler:
+    def __init__(self, schema: dict, external_schemas: dict[str, dict] | None = None):
+        self.schema = schema
+        self.external_schemas = EXTERNAL_SCHEMAS if external_schemas is None else external_schemas
+        self._compiled: dict[str, Checker] = {}
+
+    def compile(self) -> Checker:
+        return self.compile_ref("#")
+
+    def compile_ref(self, ref: str) -> Checker:
+        compiled = self._compiled.get(ref)
+        if compiled is not None:
+            return compiled
+
+        # References may be recursive, so bind lazily through the cache.
+        def check_ref(value, path):
+            return self._compiled[ref](value, path)
+
+        self._compiled[ref] = check_ref
+        self._compiled[ref] = self.compile_node(self.resolve_ref(ref))
+        return check_ref
+
+    def resolve_ref(self, ref: str) -> dict:
+        if ref in self.external_schemas:
+            return self.external_schemas[ref]
+        if not ref.startswith("#"):
+            raise SchemaError(f"Error, unresolvable schema reference {ref!r}")
+        node: object = self.schema
+        for token in [part for part in ref[1:].split("/") if part]:
+            if not isinstance(node, dict) or token not in node:
+                raise SchemaError(f"Error, unresolvable schema reference {ref!r}")
+            node = node[token]
+        if not isinstance(node, dict):
+            raise SchemaError(f"Error, schema reference {ref!r} does not point to an object")
+        return node
+
+    def compile_node(self, node: dict) -> Checker:
+        unsupported = sorted(set(node) - COMPILED_KEYWORDS - ANNOTATION_KEYWORDS)
+        if unsupported:
+            raise SchemaError(f"Error, unsupported schema keywords {', '.join(unsupported)}")
+        checks: list[Checker] = []
+
+        if "$ref" in node:
+            checks.append(self.compile_ref(node["$ref"]))
+        if "type" in node:
+            checks.append(compile_type(node["type"]))
+        if "required" in node:
+            checks.append(compile_required(node["required"]))
+        if "properties" in node or "patternProperties" in node:
+            checks.append(
+                self.compile_properties(
+                    node.get("properties", {}),
+                    node.get("patternProperties", {}),
+                )
+            )
+        if "items" in node:
+            checks.append(compile_items(self.compile_node(node["items"])))
+        if "oneOf" in node:
+            checks.append(compile_one_of([self.compile_node(option) for option in node["oneOf"]]))
+        if "not" in node:
+            checks.append(compile_not(self.compile_node(node["not"])))
+
+        if len(checks) == 1:
+            return checks[0]
+
+        def check_all(value, path):
+            for check in checks:
+                error = check(value, path)
+                if error is not None:
+                    return error
+            return None
+
+        return check_all
+
+    def compile_properties(self, properties: dict, pattern_properties: dict) -> Checker:
+        named = {key: self.compile_node(subschema) for key, subschema in properties.items()}
+        patterns = [
+            (re.compile(pattern), self.compile_node(subschema))
+            for pattern, subschema in pattern_properties.items()
+        ]
+
+        def check_properties(value, path):
+            if not isinstance(value, dict):
+                return None
+            for key, item in value.items():
+                item_path = f"{path}.{key}"
+                check = named.get(key)
+                if check is not None:
+                    error = check(item, item_path)
+                    if error is not None:
+                        return error
+                for pattern, pattern_check in patterns:
+                    if pattern.search(key) is not None:
+                        error = pattern_check(item, item_path)
+                        if error is not None:
+                            return error
+            return None
+
+        return check_properties
+
+
+def compile_type(type_name: str | list[str]) -> Checker:
+    names = [type_name] if isinstance(type_name, str) else list(type_name)
+    accepted = tuple(python_type for name in names for python_type in JSON_TYPES[name])
+    rejects_bool = bool not in accepted
+    expected = " or ".join(names)
+
+    def check_type(value, path):
+        if isinstance(value, accepted) and not (rejects_bool and isinstance(value, bool)):
+            return None
+        return f"{path}: expected {expected}, got {type(value).__name__}"
+
+    return check_type
+
+
+def compile_required(keys: list[str]) -> Checker:
+    def check_required(value, path):
+        if not isinstance(value, dict):
+            return None
+        for key in keys:
+            if key not in value:
+                return f"{path}: missing required key {key!r}"
+        return None
+
+    return check_required
+
+
+def compile_items(item_check: Checker) -> Checker:
+    def check_items(value, path):
+        if not isinstance(value, list):
+            return None
+        for index, item in enumerate(value):
+            error = item_check(item, f"{path}[{index}]")
+            if error is not None:
+                return error
+        return None
+
+    return check_items
+
+
+def compile_one_of(options: list[Checker]) -> Checker:
+    def check_one_of(value, path):
+        matches = 0
+        errors = []
+        for option in options:
+            error = option(value, path)
+            if error is None:
+                matches += 1
+                if matches > 1:
+                    return f"{path}: value matches more than one alternative"
+            else:
+                errors.append(error)
+        if matches == 1:
+            return None
+        if not errors:
+            return f"{path}: no alternative matches"
+        # Report the failure that got furthest into the value.
+        return max(errors, key=lambda error: len(error.split(": ", 1)[0]))
+
+    return check_one_of
+
+
+def compile_not(check: Checker) -> Checker:
+    def check_not(value, path):
+        if check(value, path) is None:
+            return f"{path}: value must not match the excluded schema"
+        return None
+
+    return check_not
+
+
+def load_schema(path: Path = SCHEMA_PATH) -> dict:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def compile_schema(schema: dict) -> Checker:
+    return SchemaCompiler(schema).compile()
+
+
+_SCHEMA_CHECKER: Checker | None = None
+
+
+def schema_checker() -> Checker:
+    global _SCHEMA_CHECKER
+    if _SCHEMA_CHECKER is None:
+        _SCHEMA_CHECKER = compile_schema(load_schema())
+    return _SCHEMA_CHECKER
+
+
+def validate_payload(value: object) -> list[str]:
+    error = schema_checker()(value, "$")
+    errors = [] if error is None else [error]
+    errors.extend(str(issue) for issue in RefGraph(value).issues())
+    return errors
+
+
+def validate_file(path: Path) -> ValidationResult:
+    raw = path.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    try:
+        parsed = json.loads(raw)
+    except json.JSONDecodeError as exc:
+        return ValidationResult(path, digest, (f"$: invalid JSON: {exc}",))
+    return ValidationResult(path, digest, tuple(validate_payload(parsed)))
+
+
+def schema_digest(path: Path = SCHEMA_PATH) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def load_validation_cache(cache_path: Path) -> dict[str, list[str]]:
+    if not cache_path.exists():
+        return {}
+    try:
+        cache = json.loads(cache_path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def validate_files(paths: list[Path], workers: int | None = None) -> list[ValidationResult]:
+    cache_path = SCHEMA_CACHE_DIR / f"{schema_digest()}-v{VALIDATOR_VERSION}.json"
+    cache = load_validation_cache(cache_path)
+
+    results: dict[Path, ValidationResult] = {}
+    pending: list[Path] = []
+    for path in paths:
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        cached = cache.get(digest)
+        if cached is None:
+            pending.append(path)
+        else:
+            results[path] = ValidationResult(path, digest, tuple(cached))
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for result in executor.map(validate_file, pending, chunksize=16):
+                results[result.path] = result
+                cache[result.digest] = list(result.errors)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps(cache, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+    return [results[path] for path in paths]
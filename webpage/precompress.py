@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import gzip
+import hashlib
+import json
+from pathlib import Path
+
+from settings import BUILD_CACHE_DIR, DEPLOY_MANIFEST_PATH, SITE_DIR
+from site_writer import compressed_sibling, write_if_changed
+
+PRECOMPRESS_SUFFIXES = {".html", ".md", ".json"}
+PRECOMPRESS_CACHE_DIR = BUILD_CACHE_DIR / "precompress"
+PRECOMPRESS_MANIFEST = PRECOMPRESS_CACHE_DIR / "manifest.json"
+
+
+@dataclass(frozen=True)
+class CompressionResult:
+    relpath: str
+    digest: str
+    original_size: int
+    compressed_size: int
+    status: str
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def find_precompress_sources(site_dir: Path) -> list[Path]:
+    return sorted(
+        path
+        for path in site_dir.rglob("*")
+        if path.is_file() and path.suffix in PRECOMPRESS_SUFFIXES and path != DEPLOY_MANIFEST_PATH
+    )
+
+
+def compress_file(path: Path, site_dir: Path, previous_digest: str | None) -> CompressionResult:
+    data = path.read_bytes()
+    digest = content_digest(data)
+    relpath = path.relative_to(site_dir).as_posix()
+    target = compressed_sibling(path)
+
+    # The .gz sibling is deleted whenever its source is rewritten, so an
+    # existing one with a matching manifest digest is still current.
+    if previous_digest == digest and target.exists():
+        return CompressionResult(relpath, digest, len(data), target.stat().st_size, "unchanged")
+
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    write_if_changed(target, compressed)
+    return CompressionResult(relpath, digest, len(data), len(compressed), "compressed")
+
+
+def _compress_job(job: tuple[Path, Path, str | None]) -> CompressionResult:
+    return compress_file(*job)
+
+
+def load_precompress_manifest() -> dict[str, str]:
+    if not PRECOMPRESS_MANIFEST.exists():
+        return {}
+    try:
+        manifest = json.loads(PRECOMPRESS_MANIFEST.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def precompress_site(site_dir: Path = SITE_DIR, workers: int | None = None) -> list[CompressionResult]:
+    manifest = load_precompress_manifest()
+    sources = find_precompress_sources(site_dir)
+    jobs = [
+        (path, site_dir, manifest.get(path.relative_to(site_dir).as_posix()))
+        for path in sources
+    ]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_compress_job, jobs, chunksize=16))
+
+    PRECOMPRESS_MANIFEST.parent.mkdir(parents=True, exist_ok=True)
+    PRECOMPRESS_MANIFEST.write_text(
+        json.dumps({result.relpath: result.digest for result in results}, indent=2, sort_keys=True) + "\n",
+        encoding="utf-8",
+    )
+    return results
+
+
+def section_for(relpath: str) -> str:
+    head, _, tail = relpath.partition("/")
+    return head if tail else "(root)"
+
+
+def compression_report(results: list[CompressionResult]) -> list[str]:
+    sections: dict[str, list[CompressionResult]] = {}
+    for result in results:
+        sections.setdefault(section_for(result.relpath), []).append(result)
+
+    lines = []
+    for section in sorted(sections):
+        section_results = sections[section]
+        original = sum(result.original_size for result in section_results)
+        compressed = sum(result.compressed_size for result in section_results)
+        ratio = compressed / original if original else 1.0
+        skipped = sum(1 for result in section_results if result.status != "compressed")
+        lines.append(
+            f"Precompressed {section}: {len(section_results)} files, "
+            f"{original} -> {compressed} bytes ({ratio:.1%}), {skipped} reused"
+        )
+    return lines
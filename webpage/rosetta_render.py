@@ -1,24 +1,24 @@
 from __future__ import annotations
 
 from html import escape
+import json
 from pathlib import Path
 import re
 
 from content import load_markdown_source, render_content_template, render_page_nav
-from mrdi_compare import equivalent_json
-from models import ExampleOutput
+from mrdi_compare import equivalent_json, structural_diff
+from models import ExampleOutput, RosettaIndexShard
 from settings import (
-    CATEGORY_TITLES,
     FRONT_PAGE_SOURCE,
     PARTIALS_DIR,
-    PROFILE_ORDER,
     ROOT_INDEX_MD,
     ROSETTA_INDEX_MD,
     ROSETTA_INDEX_SOURCE,
+    ROSETTA_SHARD_SOURCE,
+    SETTINGS,
     SPEC_INDEX_MD,
-    SUBCATEGORY_TITLES,
 )
-from utils import fenced_block, github_edit_url, language_for_file, profile_href, rel_link, render_data_for_markdown, slugify
+from utils import fenced_block, github_edit_url, language_for_file, profile_href, rel_link, render_output_for_markdown, slugify
 
 
 def spec_link_lines(page_path, spec_ids, spec_catalog):
@@ -62,81 +62,137 @@ def build_front_page_markdown():
     )
 
 
-def build_rosetta_index_markdown(examples, systems):
-    system_names = sorted(systems.keys())
-    category_rank = {name: idx for idx, name in enumerate(CATEGORY_TITLES.keys())}
+def category_display_name(category):
+    return SETTINGS.category_titles.get(category, category.replace("-", " ").title())
+
+
+def subcategory_display_name(category, subcategory):
+    return (
+        SETTINGS.subcategory_titles.get(category, {}).get(subcategory)
+        or subcategory.replace("-", " ").title()
+    )
+
+
+def example_count_label(example_ids):
+    return f"{len(example_ids)} example" + ("" if len(example_ids) == 1 else "s")
+
+
+def example_sort_key(example):
+    return (example.order if example.order is not None else 10_000, example.title.lower())
+
+
+def group_examples_by_subcategory(example_ids, examples):
     subcategory_rank = {
         category: {name: idx for idx, name in enumerate(titles.keys())}
-        for category, titles in SUBCATEGORY_TITLES.items()
+        for category, titles in SETTINGS.subcategory_titles.items()
     }
+    subgrouped: dict[str, list[str]] = {}
+    for example_id in example_ids:
+        subgrouped.setdefault(examples[example_id].subcategory or "__other__", []).append(example_id)
+    category = examples[example_ids[0]].category if example_ids else ""
+    ordered = sorted(
+        subgrouped.keys(),
+        key=lambda sub: (subcategory_rank.get(category, {}).get(sub, 999), sub.lower()),
+    )
+    return [
+        (sub, sorted(subgrouped[sub], key=lambda example_id: example_sort_key(examples[example_id])))
+        for sub in ordered
+    ]
 
-    grouped_examples: dict[str, list[str]] = {}
+
+def plan_rosetta_index_shards(examples) -> list[RosettaIndexShard]:
+    # One shard per category; categories above the size threshold get one
+    # shard per subcategory under a parent page that only links to them.
+    category_rank = {name: idx for idx, name in enumerate(SETTINGS.category_titles.keys())}
+    grouped: dict[str, list[str]] = {}
     for example_id, example in examples.items():
-        grouped_examples.setdefault(example.category, []).append(example_id)
+        grouped.setdefault(example.category, []).append(example_id)
+
+    shards = []
+    for category in sorted(grouped, key=lambda name: (category_rank.get(name, 999), name.lower())):
+        subgroups = group_examples_by_subcategory(grouped[category], examples)
+        example_ids = [example_id for _, sub_ids in subgroups for example_id in sub_ids]
+        parent = RosettaIndexShard(
+            id=category,
+            path_md=ROSETTA_INDEX_MD.parent / category / "index.md",
+            title=category_display_name(category),
+            category=category,
+            subcategory=None,
+            example_ids=example_ids,
+        )
+        shards.append(parent)
+        if len(example_ids) <= SETTINGS.rosetta_index_shard_size or len(subgroups) < 2:
+            continue
+        for sub, sub_ids in subgroups:
+            child = RosettaIndexShard(
+                id=f"{category}/{slugify(sub)}",
+                path_md=ROSETTA_INDEX_MD.parent / category / f"index-{slugify(sub)}.md",
+                title=f"{parent.title}: {subcategory_display_name(category, sub)}",
+                category=category,
+                subcategory=sub,
+                example_ids=sub_ids,
+            )
+            parent.child_ids.append(child.id)
+            shards.append(child)
+    return shards
 
-    sorted_groups = sorted(
-        grouped_examples.keys(),
-        key=lambda name: (category_rank.get(name, 999), name.lower()),
-    )
 
-    toc_lines = []
-    for group_id in sorted_groups:
-        display_name = CATEGORY_TITLES.get(group_id, group_id.replace("-", " ").title())
-        toc_lines.append(f"- [{display_name}](#{slugify(display_name)})")
+def example_table_lines(page_path, example_ids, examples, coverage):
+    visible_systems = coverage.systems_covering(example_ids)
 
-    lines = []
-    for group_id in sorted_groups:
-        display_name = CATEGORY_TITLES.get(group_id, group_id.replace("-", " ").title())
-        lines.append(f"## {display_name}")
-        lines.append("")
-        group_examples = grouped_examples[group_id]
+    lines = [
+        "| Example | " + " | ".join(visible_systems) + " |",
+        "| --- | " + " | ".join("---" for _ in visible_systems) + " |",
+    ]
+    for example_id in example_ids:
+        example = examples[example_id]
+        relpath = rel_link(page_path, ROOT_INDEX_MD.parent / example.output_relpath_md)
+        row = [f"[{example.title}]({relpath})"]
+        for system_name in visible_systems:
+            if coverage.has_system(example_id, system_name):
+                row.append(f"[X]({relpath}#{slugify(system_name)})")
+            else:
+                row.append("")
+        lines.append("| " + " | ".join(row) + " |")
+    lines.append("")
+    return lines
 
-        subgrouped: dict[str, list[str]] = {}
-        for example_id in group_examples:
-            sub = examples[example_id].subcategory or "__other__"
-            subgrouped.setdefault(sub, []).append(example_id)
 
-        ordered_subgroups = sorted(
-            subgrouped.keys(),
-            key=lambda sub: (subcategory_rank.get(group_id, {}).get(sub, 999), sub.lower()),
-        )
+def rosetta_page_nav(page_path, edit_path):
+    return render_page_nav(
+        [
+            ("Front Page", rel_link(page_path, ROOT_INDEX_MD)),
+            ("Rosetta Stone", rel_link(page_path, ROSETTA_INDEX_MD)),
+            ("Specification", rel_link(page_path, SPEC_INDEX_MD)),
+        ],
+        edit_link=("Edit this page", github_edit_url(edit_path)),
+        active_label="Rosetta Stone",
+    )
 
-        for sub in ordered_subgroups:
-            if len(ordered_subgroups) > 1:
-                display_sub = (
-                    SUBCATEGORY_TITLES.get(group_id, {}).get(sub)
-                    or sub.replace("-", " ").title()
-                )
-                lines.append(f"### {display_sub}")
-                lines.append("")
-
-            sub_examples = sorted(
-                subgrouped[sub],
-                key=lambda exid: (
-                    examples[exid].order if examples[exid].order is not None else 10_000,
-                    examples[exid].title.lower(),
-                ),
+
+def build_rosetta_index_markdown(coverage, shards):
+    shards_by_id = {shard.id: shard for shard in shards}
+    system_names = coverage.system_names
+
+    toc_lines = []
+    overview_lines = [
+        "| Category | Examples | " + " | ".join(system_names) + " |",
+        "| --- | --- | " + " | ".join("---" for _ in system_names) + " |",
+    ]
+    for shard in shards:
+        if shard.subcategory is not None:
+            continue
+        href = rel_link(ROSETTA_INDEX_MD, shard.path_md)
+        toc_lines.append(f"- [{shard.title}]({href}) ({example_count_label(shard.example_ids)})")
+        for child_id in shard.child_ids:
+            child = shards_by_id[child_id]
+            child_title = subcategory_display_name(child.category, child.subcategory)
+            toc_lines.append(
+                f"  - [{child_title}]({rel_link(ROSETTA_INDEX_MD, child.path_md)}) "
+                f"({example_count_label(child.example_ids)})"
             )
-            visible_systems = [
-                system_name
-                for system_name in system_names
-                if any(example_id in systems[system_name] for example_id in sub_examples)
-            ]
-
-            lines.append("| Example | " + " | ".join(visible_systems) + " |")
-            lines.append("| --- | " + " | ".join("---" for _ in visible_systems) + " |")
-            for example_id in sub_examples:
-                example = examples[example_id]
-                relpath = f"./{example.category}/{example.slug}.md"
-                row = [f"[{example.title}]({relpath})"]
-                for system_name in visible_systems:
-                    if example_id in systems[system_name]:
-                        anchor = slugify(system_name)
-                        row.append(f"[X]({relpath}#{anchor})")
-                    else:
-                        row.append("")
-                lines.append("| " + " | ".join(row) + " |")
-            lines.append("")
+        counts = [str(coverage.system_count(system_name, shard.example_ids) or "") for system_name in system_names]
+        overview_lines.append(f"| [{shard.title}]({href}) | {len(shard.example_ids)} | " + " | ".join(counts) + " |")
 
     return render_content_template(
         ROSETTA_INDEX_SOURCE,
@@ -150,30 +206,57 @@ def build_rosetta_index_markdown(examples, systems):
                 active_label="Rosetta Stone",
             ),
             "TABLE_OF_CONTENTS": "\n".join(toc_lines),
-            "EXAMPLE_TABLES": "\n".join(lines).rstrip(),
+            "EXAMPLE_TABLES": "\n".join(overview_lines),
+        },
+    )
+
+
+def build_rosetta_shard_markdown(shard, examples, coverage, shards):
+    # Only the shard's own examples are read, so a shard can be rebuilt on
+    # its own when one of its examples changes.
+    shards_by_id = {candidate.id: candidate for candidate in shards}
+    page_path = shard.path_md
+
+    link_lines = []
+    table_lines = []
+    if shard.child_ids:
+        for child_id in shard.child_ids:
+            child = shards_by_id[child_id]
+            child_title = subcategory_display_name(child.category, child.subcategory)
+            link_lines.append(
+                f"- [{child_title}]({rel_link(page_path, child.path_md)}) ({example_count_label(child.example_ids)})"
+            )
+    elif shard.subcategory is not None:
+        parent = shards_by_id[shard.category]
+        link_lines.append(f"Part of [{parent.title}]({rel_link(page_path, parent.path_md)}).")
+        table_lines.extend(example_table_lines(page_path, shard.example_ids, examples, coverage))
+    else:
+        subgroups = group_examples_by_subcategory(shard.example_ids, examples)
+        for sub, sub_ids in subgroups:
+            if len(subgroups) > 1:
+                table_lines.append(f"## {subcategory_display_name(shard.category, sub)}")
+                table_lines.append("")
+            table_lines.extend(example_table_lines(page_path, sub_ids, examples, coverage))
+
+    return render_content_template(
+        ROSETTA_SHARD_SOURCE,
+        {
+            "PAGE_NAV": rosetta_page_nav(page_path, ROSETTA_SHARD_SOURCE),
+            "TITLE": shard.title,
+            "SHARD_LINKS": "\n".join(link_lines),
+            "EXAMPLE_TABLES": "\n".join(table_lines).rstrip(),
         },
     )
 
 
-def build_example_markdown(example, systems, spec_catalog, profile_catalog):
+def build_example_markdown(example, coverage, spec_catalog, profile_catalog):
+    # Returns the page and the payload files it links to, by path.
     body = example.body.rstrip()
-    available_systems = [
-        system_name
-        for system_name in sorted(systems.keys())
-        if example.id in systems[system_name]
-    ]
+    payload_files: dict[Path, str] = {}
 
     page_path = ROOT_INDEX_MD.parent / example.output_relpath_md
     lines = [
-        render_page_nav(
-            [
-                ("Front Page", rel_link(page_path, ROOT_INDEX_MD)),
-                ("Rosetta Stone", rel_link(page_path, ROSETTA_INDEX_MD)),
-                ("Specification", rel_link(page_path, SPEC_INDEX_MD)),
-            ],
-            edit_link=("Edit this page", github_edit_url(example.path)),
-            active_label="Rosetta Stone",
-        ),
+        rosetta_page_nav(page_path, example.path),
         f"# Example: {example.title}",
         "",
         *profile_lines(page_path, example.profiles, profile_catalog),
@@ -184,11 +267,11 @@ def build_example_markdown(example, systems, spec_catalog, profile_catalog):
     lines.extend(spec_link_lines(page_path, example.spec_ids, spec_catalog))
 
     system_lines = []
-    for system_name in available_systems:
+    for system_name in coverage.example_systems(example.id):
         system_lines.append(f"### {system_name}")
         system_lines.append("")
 
-        system_example = systems[system_name].get(example.id)
+        system_example = example.systems[system_name]
         outputs = sorted(system_example.outputs.values(), key=lambda output: output.id)
         shared_generate_files = system_example.shared_generate_files
 
@@ -206,13 +289,14 @@ def build_example_markdown(example, systems, spec_catalog, profile_catalog):
                     outputs,
                     shared_generate_files,
                     profile_catalog,
-                    example.unavailable_profiles,
+                    coverage,
                     example.unavailable_note,
+                    payload_files,
                 )
             )
             system_lines.append("")
 
-        if not shared_generate_files and not any(output.data_file is not None for output in outputs):
+        if not shared_generate_files and not coverage.output_profiles(example.id, system_name):
             system_lines.append(load_markdown_source(PARTIALS_DIR / "example-no-system.md").strip())
             system_lines.append("")
 
@@ -225,7 +309,7 @@ def build_example_markdown(example, systems, spec_catalog, profile_catalog):
         ).splitlines() + [""]
     )
 
-    return "\n".join(lines).rstrip() + "\n"
+    return "\n".join(lines).rstrip() + "\n", payload_files
 
 
 def render_generate_sections(generate_files: list[Path]) -> list[str]:
@@ -252,7 +336,7 @@ def output_heading(page_path, output_id, profile_catalog):
 def output_sort_key(output):
     if output.profile_id is None:
         return (10_000, output.id)
-    return (PROFILE_ORDER.get(output.profile_id, 10_000), output.id)
+    return (SETTINGS.profile_order.get(output.profile_id, 10_000), output.id)
 
 
 def choose_representative_output(outputs):
@@ -313,10 +397,11 @@ def render_output_tabs(
     outputs,
     shared_generate_files,
     profile_catalog,
-    unavailable_profiles,
+    coverage,
     unavailable_note,
+    payload_files,
 ):
-    outputs = [output for output in outputs if output.data_file is not None]
+    outputs = [output for output in outputs if coverage.has_output(example_id, system_name, output.id)]
     output_groups = equivalent_output_groups(outputs)
     container_id = f"tabs_{tab_slug(example_id)}_{tab_slug(system_name)}"
     lines = [
@@ -338,7 +423,7 @@ def render_output_tabs(
             }
         )
 
-    for profile_id in unavailable_profiles:
+    for profile_id in coverage.unavailable_profiles(example_id):
         tab_specs.append(
             {
                 "kind": "unavailable",
@@ -371,6 +456,7 @@ def render_output_tabs(
 
     lines.append("</div>")
 
+    previous_output_tab = None
     for tab in tab_specs:
         panel_lines = [
             f'<div class="output-tab-panel" role="tabpanel" id="{tab["panel_id"]}">'
@@ -389,19 +475,47 @@ def render_output_tabs(
 
             if representative.data_file is not None:
                 language = language_for_file(representative.data_file)
-                data = render_data_for_markdown(representative.data_file)
+                data = render_output_for_markdown(representative)
+                escaped_data = escape(data)
                 panel_lines.append(
                     f"<p><strong>Data file:</strong> <code>{escape(representative.data_file.name)}</code></p>"
                 )
-                panel_lines.append(
-                    f'<pre><code class="language-{escape(language)}">{escape(data)}</code></pre>'
-                )
+                # The limit applies to the escaped text the page would embed.
+                if len(escaped_data.encode("utf-8")) > SETTINGS.payload_inline_limit:
+                    payload_path = payload_path_for(page_path, system_name, representative)
+                    payload_files[payload_path] = data.rstrip() + "\n"
+                    panel_lines.extend(
+                        render_external_payload_html(
+                            rel_link(page_path, payload_path),
+                            representative,
+                            language,
+                        )
+                    )
+                else:
+                    panel_lines.append(
+                        f'<pre><code class="language-{escape(language)}">{escaped_data}</code></pre>'
+                    )
 
             if len(output_group) > 1:
                 panel_lines.append(
                     "<p>This serialized output is equivalent for these profiles up to "
                     "UUID renaming and recorded namespace version strings.</p>"
                 )
+
+            if previous_output_tab is not None:
+                previous = choose_representative_output(previous_output_tab["output_group"])
+                if previous.parsed_data is not None and representative.parsed_data is not None:
+                    panel_lines.extend(
+                        render_output_diff_html(
+                            previous_output_tab["label"],
+                            structural_diff(
+                                previous.parsed_data,
+                                representative.parsed_data,
+                                ignore_namespace_versions=True,
+                            ),
+                        )
+                    )
+            previous_output_tab = tab
         else:
             profile_id = tab["profile_id"]
             label = output_label_html(page_path, profile_id, profile_catalog)
@@ -417,6 +531,75 @@ def render_output_tabs(
     return lines
 
 
+MAX_DIFF_ENTRIES = 40
+DIFF_VALUE_PREVIEW = 80
+
+
+def diff_value_preview(value):
+    text = json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+    if len(text) > DIFF_VALUE_PREVIEW:
+        text = text[: DIFF_VALUE_PREVIEW - 3] + "..."
+    return f"<code>{escape(text)}</code>"
+
+
+def render_output_diff_html(previous_label, entries):
+    if not entries:
+        return []
+    lines = [
+        '<details class="output-tab-diff">',
+        f"<summary>Changes since {escape(previous_label)} ({len(entries)})</summary>",
+        "<ul>",
+    ]
+    for entry in entries[:MAX_DIFF_ENTRIES]:
+        path = f"<code>{escape(entry.path)}</code>"
+        if entry.kind == "added":
+            lines.append(f"<li>{path} added: {diff_value_preview(entry.right)}</li>")
+        elif entry.kind == "removed":
+            lines.append(f"<li>{path} removed: {diff_value_preview(entry.left)}</li>")
+        else:
+            lines.append(
+                f"<li>{path} {entry.kind}: {diff_value_preview(entry.left)} &rarr; {diff_value_preview(entry.right)}</li>"
+            )
+    if len(entries) > MAX_DIFF_ENTRIES:
+        lines.append(f"<li>... and {len(entries) - MAX_DIFF_ENTRIES} more</li>")
+    lines.append("</ul>")
+    lines.append(
+        "<p>Compared up to UUID renaming and namespace version strings.</p>"
+    )
+    lines.append("</details>")
+    return lines
+
+
+def payload_path_for(page_path, system_name, output):
+    return page_path.with_suffix("") / f"{tab_slug(system_name)}_{tab_slug(output.id)}.json"
+
+
+def payload_summary_html(output):
+    items = []
+    if output.root_type:
+        items.append(f"root type <code>{escape(output.root_type)}</code>")
+    if output.census is not None:
+        items.append(f"{output.census.node_count} nodes")
+    if isinstance(output.parsed_data, dict) and output.parsed_data:
+        keys = ", ".join(f"<code>{escape(str(key))}</code>" for key in output.parsed_data)
+        items.append(f"top-level keys {keys}")
+    if not items:
+        return None
+    return f"<p><strong>Summary:</strong> {'; '.join(items)}</p>"
+
+
+def render_external_payload_html(href, output, language):
+    lines = []
+    summary = payload_summary_html(output)
+    if summary is not None:
+        lines.append(summary)
+    lines.append(
+        f'<pre><code class="language-{escape(language)}" data-payload-src="{escape(href)}">'
+        f'Loading <a href="{escape(href)}">{escape(output.data_file.name)}</a>...</code></pre>'
+    )
+    return lines
+
+
 def output_button_label(output_id, profile_catalog):
     if output_id in profile_catalog:
         return profile_catalog[output_id].title
@@ -446,7 +629,7 @@ def tab_sort_key(tab):
     if not hashes:
         return (10_000, tab["label"])
     return (
-        min(PROFILE_ORDER.get(profile_id, 10_000) for profile_id in hashes),
+        min(SETTINGS.profile_order.get(profile_id, 10_000) for profile_id in hashes),
         tab["label"],
     )
 
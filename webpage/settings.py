@@ -1,10 +1,9 @@
 from __future__ import annotations
 
+from functools import cached_property
 from pathlib import Path
 import json
 
-from content import parse_description
-
 MODULE_DIR = Path(__file__).resolve().parent
 ROOT = MODULE_DIR.parent
 CONTENT_DIR = ROOT / "content"
@@ -12,9 +11,14 @@ PROFILE_SOURCE_DIR = ROOT / "profiles"
 ROSETTA_SOURCE_DIR = ROOT / "rosetta"
 SPEC_SOURCE_DIR = ROOT / "spec"
 SITE_DIR = ROOT / "_site"
-TEMPLATE_PATH = ROOT / "templates" / "default.html"
+BUILD_CACHE_DIR = ROOT / ".build-cache"
+DEPLOY_MANIFEST_PATH = SITE_DIR / "deploy-manifest.json"
+CORPUS_BUNDLE_PATH = SITE_DIR / "corpus.bundle"
+TEMPLATES_DIR = ROOT / "templates"
+TEMPLATE_CACHE_DIR = BUILD_CACHE_DIR / "templates"
 FRONT_PAGE_SOURCE = CONTENT_DIR / "front-page.md"
 ROSETTA_INDEX_SOURCE = CONTENT_DIR / "rosetta-index.md"
+ROSETTA_SHARD_SOURCE = CONTENT_DIR / "rosetta-category.md"
 SPEC_INDEX_SOURCE = CONTENT_DIR / "spec-index.md"
 PARTIALS_DIR = CONTENT_DIR / "partials"
 ROOT_INDEX_MD = SITE_DIR / "index.md"
@@ -24,14 +28,12 @@ SPEC_SITE_DIR = SITE_DIR / "spec"
 SPEC_INDEX_MD = SPEC_SITE_DIR / "index.md"
 SCHEMA_PATH = ROOT / "paper" / "data.json"
 
-_CONFIG = json.loads((MODULE_DIR / "config.json").read_text(encoding="utf-8"))
+CONFIG_PATH = MODULE_DIR / "config.json"
+
 
-CATEGORY_TITLES = _CONFIG["category_titles"]
-SUBCATEGORY_TITLES = _CONFIG["subcategory_titles"]
-TYPE_SPEC_BY_ROOT_TYPE = _CONFIG["type_spec_by_root_type"]
-TYPE_SPEC_BY_ROOT_TYPE_AND_PROFILE = _CONFIG.get("type_spec_by_root_type_and_profile", {})
-LANGUAGE_BY_SUFFIX = _CONFIG["language_by_suffix"]
 def load_profile_definitions():
+    from content import parse_description
+
     definitions = {}
     for profile_path in sorted(PROFILE_SOURCE_DIR.glob("*.md")):
         metadata, body = parse_description(profile_path)
@@ -47,8 +49,75 @@ def load_profile_definitions():
     return definitions
 
 
-PROFILE_DEFINITIONS = load_profile_definitions()
-PROFILE_ORDER = {profile_id: index for index, profile_id in enumerate(PROFILE_DEFINITIONS.keys())}
+class Settings:
+    # config.json and the profile sources are read on first access, once per
+    # process, so tools that never touch them do not pay for parsing them.
+
+    @cached_property
+    def config(self) -> dict:
+        return json.loads(CONFIG_PATH.read_text(encoding="utf-8"))
+
+    @cached_property
+    def category_titles(self) -> dict[str, str]:
+        return self.config["category_titles"]
+
+    @cached_property
+    def subcategory_titles(self) -> dict[str, dict[str, str]]:
+        return self.config["subcategory_titles"]
+
+    @cached_property
+    def type_spec_by_root_type(self) -> dict[str, str]:
+        return self.config["type_spec_by_root_type"]
+
+    @cached_property
+    def type_spec_by_root_type_and_profile(self) -> dict[str, dict[str, str]]:
+        return self.config.get("type_spec_by_root_type_and_profile", {})
+
+    @cached_property
+    def language_by_suffix(self) -> dict[str, str]:
+        return self.config["language_by_suffix"]
+
+    @cached_property
+    def payload_inline_limit(self) -> int:
+        return int(self.config.get("payload_inline_limit", 8192))
+
+    @cached_property
+    def rosetta_index_shard_size(self) -> int:
+        return int(self.config.get("rosetta_index_shard_size", 20))
+
+    @cached_property
+    def profile_definitions(self) -> dict[str, dict]:
+        return load_profile_definitions()
+
+    @cached_property
+    def profile_order(self) -> dict[str, int]:
+        return {profile_id: index for index, profile_id in enumerate(self.profile_definitions.keys())}
+
+
+SETTINGS = Settings()
+
+_LAZY_SETTINGS = {
+    "CATEGORY_TITLES": "category_titles",
+    "SUBCATEGORY_TITLES": "subcategory_titles",
+    "TYPE_SPEC_BY_ROOT_TYPE": "type_spec_by_root_type",
+    "TYPE_SPEC_BY_ROOT_TYPE_AND_PROFILE": "type_spec_by_root_type_and_profile",
+    "LANGUAGE_BY_SUFFIX": "language_by_suffix",
+    "PAYLOAD_INLINE_LIMIT": "payload_inline_limit",
+    "ROSETTA_INDEX_SHARD_SIZE": "rosetta_index_shard_size",
+    "PROFILE_DEFINITIONS": "profile_definitions",
+    "PROFILE_ORDER": "profile_order",
+}
+
+
+def __getattr__(name: str):
+    # Keeps `settings.PROFILE_ORDER` and friends working for external callers;
+    # `from settings import PROFILE_ORDER` forces the load at import time, so
+    # modules inside webpage/ go through SETTINGS instead.
+    attribute = _LAZY_SETTINGS.get(name)
+    if attribute is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(SETTINGS, attribute)
+
 
 GITHUB_EDIT_BASE = "https://github.com/oscar-system/rosetta-stone-db_prototype/edit/main/"
 
@@ -57,11 +126,11 @@ def resolve_type_spec(root_type: str | None, profile_id: str | None) -> str | No
     if root_type is None:
         return None
 
-    profile_map = TYPE_SPEC_BY_ROOT_TYPE_AND_PROFILE.get(root_type)
+    profile_map = SETTINGS.type_spec_by_root_type_and_profile.get(root_type)
     if isinstance(profile_map, dict) and profile_id is not None:
         spec_id = profile_map.get(profile_id)
         if isinstance(spec_id, str):
             return spec_id
 
-    spec_id = TYPE_SPEC_BY_ROOT_TYPE.get(root_type)
+    spec_id = SETTINGS.type_spec_by_root_type.get(root_type)
     return spec_id if isinstance(spec_id, str) else None
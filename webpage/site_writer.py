@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from settings import DEPLOY_MANIFEST_PATH
+
+# Every path handed to write_if_changed in this process, changed or not, so a
+# full build can prune whatever it did not produce.
+_WRITTEN_PATHS: set[Path] = set()
+
+
+def compressed_sibling(path: Path) -> Path:
+    return path.with_name(path.name + ".gz")
+
+
+def file_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_if_changed(path: Path, data: str | bytes) -> bool:
+    raw = data.encode("utf-8") if isinstance(data, str) else data
+    _WRITTEN_PATHS.add(path)
+    try:
+        if path.stat().st_size == len(raw) and file_digest(path.read_bytes()) == file_digest(raw):
+            return False
+    except FileNotFoundError:
+        pass
+
+    # Write next to the target and rename, so readers never see a partial file.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        temp_path.write_bytes(raw)
+        os.replace(temp_path, path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+    # A precompressed copy of the old content is stale now; --precompress
+    # writes a fresh one, and partial builds must not deploy the old one.
+    compressed_sibling(path).unlink(missing_ok=True)
+    return True
+
+
+def stream_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def streamed_temp_path(path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+
+def replace_if_changed(path: Path, temp_path: Path) -> bool:
+    # write_if_changed for files written in pieces to streamed_temp_path(path),
+    # so the whole content never has to be held in memory.
+    _WRITTEN_PATHS.add(path)
+    try:
+        try:
+            if path.stat().st_size == temp_path.stat().st_size and stream_digest(path) == stream_digest(temp_path):
+                return False
+        except FileNotFoundError:
+            pass
+        os.replace(temp_path, path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+    compressed_sibling(path).unlink(missing_ok=True)
+    return True
+
+
+def remove_site_file(path: Path) -> None:
+    path.unlink(missing_ok=True)
+    compressed_sibling(path).unlink(missing_ok=True)
+    _WRITTEN_PATHS.discard(path)
+
+
+def written_paths() -> set[Path]:
+    return set(_WRITTEN_PATHS)
+
+
+def prune_site(site_dir: Path, keep: set[Path]) -> list[Path]:
+    removed = []
+    for path in sorted(site_dir.rglob("*"), reverse=True):
+        if path.is_file() and path not in keep and path != DEPLOY_MANIFEST_PATH:
+            path.unlink()
+            removed.append(path)
+        elif path.is_dir() and not any(path.iterdir()):
+            path.rmdir()
+    return removed
+
+
+def build_deploy_manifest(site_dir: Path) -> dict[str, dict[str, object]]:
+    manifest: dict[str, dict[str, object]] = {}
+    for path in sorted(site_dir.rglob("*")):
+        if not path.is_file() or path == DEPLOY_MANIFEST_PATH:
+            continue
+        data = path.read_bytes()
+        manifest[path.relative_to(site_dir).as_posix()] = {"sha256": file_digest(data), "size": len(data)}
+    return manifest
+
+
+def write_deploy_manifest(
+    site_dir: Path,
+    manifest_path: Path = DEPLOY_MANIFEST_PATH,
+) -> tuple[dict[str, dict[str, object]], bool]:
+    manifest = build_deploy_manifest(site_dir)
+    changed = write_if_changed(manifest_path, json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    return manifest, changed
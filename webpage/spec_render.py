@@ -3,14 +3,18 @@ from __future__ import annotations
 from html import escape
 
 from content import render_content_template, render_page_nav, replace_placeholders
-from settings import CATEGORY_TITLES, PARTIALS_DIR, PROFILE_ORDER, ROOT_INDEX_MD, ROSETTA_INDEX_MD, SCHEMA_PATH, SPEC_INDEX_MD, SPEC_INDEX_SOURCE, resolve_type_spec
-from utils import fenced_block, github_edit_url, profile_href, rel_link, render_data_for_markdown
+from models import Namespace
+from settings import PARTIALS_DIR, ROOT_INDEX_MD, ROSETTA_INDEX_MD, SCHEMA_PATH, SETTINGS, SPEC_INDEX_MD, SPEC_INDEX_SOURCE, resolve_type_spec
+from utils import fenced_block, github_edit_url, profile_href, rel_link, render_data_for_markdown, render_output_for_markdown
+
+
+UNKNOWN_NAMESPACE = Namespace("", "", "")
 
 
 def output_profile_sort_key(output):
     if output.profile_id is None:
         return (10_000, "")
-    return (PROFILE_ORDER.get(output.profile_id, 10_000), output.profile_id)
+    return (SETTINGS.profile_order.get(output.profile_id, 10_000), output.profile_id)
 
 
 def render_profiles_table(example_ids, examples, page_path):
@@ -24,11 +28,11 @@ def render_profiles_table(example_ids, examples, page_path):
             for output in sorted(system.outputs.values(), key=output_profile_sort_key):
                 if resolve_type_spec(output.root_type, output.profile_id) != spec_id:
                     continue
-                namespaces = output.namespaces or [{"name": "", "url": "", "version": ""}]
+                namespaces = output.namespaces or (UNKNOWN_NAMESPACE,)
                 for namespace in namespaces:
-                    namespace_name = namespace["name"] or system_name
-                    version = namespace["version"] or "unspecified"
-                    url = namespace["url"]
+                    namespace_name = namespace.name or system_name
+                    version = namespace.version or "unspecified"
+                    url = namespace.url
                     profile_label = namespace_name
                     if url:
                         profile_label = f"[{namespace_name}]({url})"
@@ -63,7 +67,7 @@ def sample_payload_for_spec(spec_id, example_ids, examples):
         return None
 
     best_output = max(candidates, key=output_profile_sort_key)
-    return render_data_for_markdown(best_output.data_file)
+    return render_output_for_markdown(best_output)
 
 
 def render_page_profiles(profile_ids, profile_catalog, page_path):
@@ -226,7 +230,7 @@ def render_application_profile_tabs(application_profiles, profile_catalog, spec_
 
 
 def build_spec_index_markdown(spec_catalog):
-    category_rank = {name: idx for idx, name in enumerate(CATEGORY_TITLES.keys())}
+    category_rank = {name: idx for idx, name in enumerate(SETTINGS.category_titles.keys())}
     core_pages = sorted(
         (spec for spec in spec_catalog.values() if spec.kind == "core"),
         key=lambda spec: (
@@ -253,7 +257,7 @@ def build_spec_index_markdown(spec_catalog):
                 type_lines.append("")
             current_section = spec.section
             section_title = (
-                CATEGORY_TITLES.get(current_section, current_section.replace("-", " ").title())
+                SETTINGS.category_titles.get(current_section, current_section.replace("-", " ").title())
                 if current_section
                 else "Other"
             )
@@ -6,7 +6,7 @@ import re
 from pathlib import Path
 from urllib.parse import quote
 
-from settings import GITHUB_EDIT_BASE, LANGUAGE_BY_SUFFIX, ROOT
+from settings import GITHUB_EDIT_BASE, ROOT, SETTINGS
 
 
 def slugify(value: str) -> str:
@@ -28,7 +28,7 @@ def profile_href(from_path: Path) -> str:
 
 
 def language_for_file(path: Path) -> str:
-    return LANGUAGE_BY_SUFFIX.get(path.suffix, "")
+    return SETTINGS.language_by_suffix.get(path.suffix, "")
 
 
 def fenced_block(content: str, language: str) -> str:
@@ -99,3 +99,17 @@ def render_data_for_markdown(path: Path) -> str:
         except json.JSONDecodeError:
             return raw
     return raw
+
+
+def render_output_for_markdown(output) -> str:
+    # Aliased outputs share the target's data file, whose `_ns` may not be
+    # theirs, so they are rendered from their own payload.
+    if output.alias_of is not None:
+        payload = output.parsed_data
+        if payload is None:
+            from discovery import reload_output
+
+            payload = reload_output(output).parsed_data
+        if payload is not None:
+            return format_json_compact(payload, indent_size=2, max_width=100)
+    return render_data_for_markdown(output.data_file)